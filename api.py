@@ -2,14 +2,19 @@ import asyncio
 import json
 import logging
 import time
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 import aiohttp
 from tenacity import before_sleep_log, retry, retry_if_exception_type, wait_fixed
 
 from botli_dataclasses import ApiChallengeResponse, ChallengeRequest
+from clock_model import clock_model
 from config import Config
 from enums import DeclineReason, Variant
+from exceptions import SourceUnavailableError
+from online_cache import OnlineCache
+from source_health import source_health
 
 logger = logging.getLogger(__name__)
 BASIC_RETRY_CONDITIONS = {
@@ -33,6 +38,7 @@ MOVE_RETRY_CONDITIONS = {
     "before_sleep": before_sleep_log(logger, logging.DEBUG),
 }
 STREAM_TIMEOUT = aiohttp.ClientTimeout(sock_connect=5.0, sock_read=9.0)
+SOURCE_NAMES = {"chessdb": "ChessDB", "lichess_cloud": "Cloud", "online_egtb": "EGTB", "opening_explorer": "Explore"}
 
 
 class API:
@@ -43,6 +49,8 @@ class API:
             timeout=aiohttp.ClientTimeout(total=5.0),
         )
         self.external_session = aiohttp.ClientSession(headers={"User-Agent": f"BotLi/{config.version}"})
+        self.cache = OnlineCache(config.online_moves.cache) if config.online_moves.cache.enabled else None
+        self.pending_requests: dict[str, asyncio.Task[dict[str, Any] | None]] = {}
 
     async def __aenter__(self) -> "API":
         return self
@@ -58,6 +66,9 @@ class API:
         await self.lichess_session.close()
         await self.external_session.close()
 
+        if self.cache:
+            self.cache.close()
+
     @retry(**BASIC_RETRY_CONDITIONS)
     async def abort_game(self, game_id: str) -> bool:
         try:
@@ -185,46 +196,86 @@ class API:
             return json_response
 
     async def get_chessdb_eval(self, fen: str, best_move: bool, timeout: int) -> dict[str, Any] | None:
-        try:
-            async with self.external_session.get(
-                "http://www.chessdb.cn/cdb.php",
-                params={"action": "querypv", "board": fen, "json": 1, "stable": int(best_move)},
-                timeout=aiohttp.ClientTimeout(total=timeout),
-            ) as response:
-                response.raise_for_status()
-                return await response.json()
-        except (aiohttp.ClientError, json.JSONDecodeError) as e:
-            print(f"ChessDB: {e}")
-        except TimeoutError:
-            print(f"ChessDB: Timed out after {timeout} second(s).")
+        cache_key = OnlineCache.get_key("chessdb", fen, best_move)
+        return await self._get_coalesced(
+            "chessdb", cache_key, timeout, lambda: self._fetch_chessdb_eval(fen, best_move, timeout, cache_key)
+        )
+
+    async def _fetch_chessdb_eval(
+        self, fen: str, best_move: bool, timeout: int, cache_key: str
+    ) -> dict[str, Any] | None:
+        async with self.external_session.get(
+            "http://www.chessdb.cn/cdb.php",
+            params={"action": "querypv", "board": fen, "json": 1, "stable": int(best_move)},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            response.raise_for_status()
+            json_response = await response.json()
+            if json_response.get("status") in {"ok", "unknown"}:
+                self._cache_response(
+                    "chessdb", cache_key, json_response, is_negative=json_response["status"] == "unknown"
+                )
+            return json_response
 
     async def get_cloud_eval(self, fen: str, variant: Variant, timeout: int) -> dict[str, Any] | None:
-        try:
-            async with self.lichess_session.get(
-                "/api/cloud-eval", params={"fen": fen, "variant": variant}, timeout=aiohttp.ClientTimeout(total=timeout)
-            ) as response:
-                if response.status == 404:
-                    return
-                response.raise_for_status()
-                return await response.json()
-        except (aiohttp.ClientError, json.JSONDecodeError) as e:
-            print(f"Cloud: {e}")
-        except TimeoutError:
-            print(f"Cloud: Timed out after {timeout} second(s).")
+        cache_key = OnlineCache.get_key("lichess_cloud", fen, variant)
+        return await self._get_coalesced(
+            "lichess_cloud", cache_key, timeout, lambda: self._fetch_cloud_eval(fen, variant, timeout, cache_key)
+        )
+
+    async def _fetch_cloud_eval(
+        self, fen: str, variant: Variant, timeout: int, cache_key: str
+    ) -> dict[str, Any] | None:
+        async with self.lichess_session.get(
+            "/api/cloud-eval", params={"fen": fen, "variant": variant}, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            if response.status == 404:
+                self._cache_response("lichess_cloud", cache_key, None, is_negative=True)
+                return
+            response.raise_for_status()
+            json_response = await response.json()
+            if "error" not in json_response:
+                self._cache_response("lichess_cloud", cache_key, json_response)
+            return json_response
 
     async def get_egtb(self, fen: str, variant: str, timeout: int) -> dict[str, Any] | None:
-        try:
-            async with self.external_session.get(
-                f"https://tablebase.lichess.ovh/{variant}",
-                params={"fen": fen},
-                timeout=aiohttp.ClientTimeout(total=timeout),
-            ) as response:
-                response.raise_for_status()
-                return await response.json()
-        except (aiohttp.ClientError, json.JSONDecodeError) as e:
-            print(f"EGTB: {e}")
-        except TimeoutError:
-            print(f"EGTB: Timed out after {timeout} second(s).")
+        cache_key = OnlineCache.get_key("online_egtb", fen, variant)
+        return await self._get_coalesced(
+            "online_egtb", cache_key, timeout, lambda: self._fetch_egtb(fen, variant, timeout, cache_key)
+        )
+
+    async def _fetch_egtb(self, fen: str, variant: str, timeout: int, cache_key: str) -> dict[str, Any] | None:
+        async with self.external_session.get(
+            f"https://tablebase.lichess.ovh/{variant}",
+            params={"fen": fen},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            response.raise_for_status()
+            json_response = await response.json()
+            self._cache_response(
+                "online_egtb", cache_key, json_response, is_negative=json_response.get("category") == "unknown"
+            )
+            return json_response
+
+    async def get_egtb_mainline(self, fen: str, variant: str, timeout: int) -> dict[str, Any] | None:
+        cache_key = OnlineCache.get_key("online_egtb", fen, variant, "mainline")
+        return await self._get_coalesced(
+            "online_egtb", cache_key, timeout, lambda: self._fetch_egtb_mainline(fen, variant, timeout, cache_key)
+        )
+
+    async def _fetch_egtb_mainline(self, fen: str, variant: str, timeout: int, cache_key: str) -> dict[str, Any] | None:
+        async with self.external_session.get(
+            f"https://tablebase.lichess.ovh/{variant}/mainline",
+            params={"fen": fen},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            if response.status == 404:
+                self._cache_response("online_egtb", cache_key, None, is_negative=True)
+                return
+            response.raise_for_status()
+            json_response = await response.json()
+            self._cache_response("online_egtb", cache_key, json_response)
+            return json_response
 
     @retry(**JSON_RETRY_CONDITIONS)
     async def get_event_stream(self, queue: asyncio.Queue[dict[str, Any]]) -> None:
@@ -259,18 +310,29 @@ class API:
             if modes:
                 params["modes"] = modes
 
-        try:
-            async with self.external_session.get(
-                url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)
-            ) as response:
-                response.raise_for_status()
-                async for line in response.content:
-                    if line.strip():
-                        return json.loads(line)
-        except (aiohttp.ClientError, json.JSONDecodeError) as e:
-            print(f"Explore: {e}")
-        except TimeoutError:
-            print(f"Explore: Timed out after {timeout} second(s).")
+        cache_key = OnlineCache.get_key(
+            "opening_explorer", fen, url, {key: value for key, value in params.items() if key != "fen"}
+        )
+        return await self._get_coalesced(
+            "opening_explorer",
+            cache_key,
+            timeout,
+            lambda: self._fetch_opening_explorer(url, params, timeout, cache_key),
+        )
+
+    async def _fetch_opening_explorer(
+        self, url: str, params: dict[str, Any], timeout: int, cache_key: str
+    ) -> dict[str, Any] | None:
+        async with self.external_session.get(
+            url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if line.strip():
+                    json_response = json.loads(line)
+                    game_count = json_response["white"] + json_response["draws"] + json_response["black"]
+                    self._cache_response("opening_explorer", cache_key, json_response, is_negative=not game_count)
+                    return json_response
 
     @retry(**JSON_RETRY_CONDITIONS)
     async def get_token_scopes(self, token: str) -> str:
@@ -323,11 +385,51 @@ class API:
                 return False
             return True
 
+    async def _get_coalesced(
+        self, source: str, cache_key: str, timeout: int, fetch: Callable[[], Awaitable[dict[str, Any] | None]]
+    ) -> dict[str, Any] | None:
+        if self.cache:
+            is_cached, cached_response = self.cache.get(cache_key)
+            if is_cached:
+                return cached_response
+
+        if (task := self.pending_requests.get(cache_key)) is None:
+            if not source_health.allow_request(source):
+                raise SourceUnavailableError(source)
+
+            task = asyncio.create_task(self._fetch(source, timeout, fetch))
+            self.pending_requests[cache_key] = task
+            task.add_done_callback(lambda _: self.pending_requests.pop(cache_key, None))
+
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self, source: str, timeout: int, fetch: Callable[[], Awaitable[dict[str, Any] | None]]
+    ) -> dict[str, Any] | None:
+        start_time = time.perf_counter()
+        try:
+            response = await fetch()
+        except (aiohttp.ClientError, json.JSONDecodeError) as e:
+            print(f"{SOURCE_NAMES[source]}: {e}")
+        except TimeoutError:
+            print(f"{SOURCE_NAMES[source]}: Timed out after {timeout} second(s).")
+        else:
+            source_health.record_success(source, time.perf_counter() - start_time)
+            return response
+
+        source_health.record_failure(source)
+
+    def _cache_response(self, source: str, cache_key: str, response: Any, is_negative: bool = False) -> None:
+        if self.cache:
+            self.cache.set(source, cache_key, response, is_negative)
+
     async def ping(self) -> float:
         try:
             start_time = time.perf_counter()
             async with self.lichess_session.get("/__ping"):
-                return time.perf_counter() - start_time
+                latency = time.perf_counter() - start_time
+                clock_model.record_latency(latency)
+                return latency
         except (aiohttp.ClientError, TimeoutError):
             return float("NaN")
 
@@ -359,12 +461,14 @@ class API:
     @retry(**MOVE_RETRY_CONDITIONS)
     async def send_move(self, game_id: str, uci_move: str, offer_draw: bool) -> bool:
         try:
+            start_time = time.perf_counter()
             async with self.lichess_session.post(
                 f"/api/bot/game/{game_id}/move/{uci_move}",
                 params={"offeringDraw": "true" if offer_draw else "false"},
                 timeout=aiohttp.ClientTimeout(total=1.0),
             ) as response:
                 response.raise_for_status()
+                clock_model.record_latency(time.perf_counter() - start_time)
                 return True
         except aiohttp.ClientResponseError as e:
             if 500 <= e.status <= 599:
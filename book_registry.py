@@ -0,0 +1,135 @@
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+from itertools import pairwise
+
+import chess
+import chess.polyglot
+from chess.polyglot import Entry, MemoryMappedReader
+
+from configs import BooksConfig, OpeningBooksConfig
+
+
+class BookFileIndex:
+    def __init__(self, reader: MemoryMappedReader) -> None:
+        self.reader = reader
+
+        words = array("Q")
+        words.frombytes(reader.mmap)
+        if sys.byteorder == "little":
+            words.byteswap()
+
+        self.keys = words[::2]
+        self.locations: array[int] | None = None
+        if any(key > next_key for key, next_key in pairwise(self.keys)):
+            self.locations = array("Q", sorted(range(len(self.keys)), key=self.keys.__getitem__))
+            self.keys = array("Q", (self.keys[location] for location in self.locations))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def find(self, board: chess.Board, key: int) -> list[Entry]:
+        entries: list[Entry] = []
+        index = bisect_left(self.keys, key)
+        while index < len(self.keys) and self.keys[index] == key:
+            entry = self.reader[index if self.locations is None else self.locations[index]]
+            index += 1
+
+            if not entry.weight:
+                continue
+
+            move = board._from_chess960(
+                board.chess960, entry.move.from_square, entry.move.to_square, entry.move.promotion, entry.move.drop
+            )
+            if board.is_legal(move):
+                entries.append(Entry(entry.key, entry.raw_move, entry.weight, entry.learn, move))
+
+        return entries
+
+
+class BookIndex:
+    def __init__(self, file_indexes: dict[str, BookFileIndex]) -> None:
+        self.file_indexes = file_indexes
+
+    def __len__(self) -> int:
+        return sum(len(file_index) for file_index in self.file_indexes.values())
+
+    def find_all(self, board: chess.Board, key: int | None = None) -> Iterator[tuple[str, list[Entry]]]:
+        if key is None:
+            key = chess.polyglot.zobrist_hash(board)
+
+        for name, file_index in self.file_indexes.items():
+            if entries := file_index.find(board, key):
+                yield name, entries
+
+
+class BookRegistry:
+    def __init__(self) -> None:
+        self.readers: dict[str, MemoryMappedReader] = {}
+        self.file_indexes: dict[str, BookFileIndex] = {}
+        self.indexes: dict[tuple[str, ...], BookIndex] = {}
+
+    def open_books(self, opening_books_config: OpeningBooksConfig) -> None:
+        if not opening_books_config.enabled:
+            return
+
+        for books_config in opening_books_config.books.values():
+            self.get_index(books_config)
+
+    def get_reader(self, path: str) -> MemoryMappedReader:
+        real_path = os.path.realpath(path)
+        if (reader := self.readers.get(real_path)) is not None:
+            return reader
+
+        reader = chess.polyglot.open_reader(real_path)
+        self.readers[real_path] = reader
+        return reader
+
+    def get_readers(self, books_config: BooksConfig) -> dict[str, MemoryMappedReader]:
+        readers: dict[str, MemoryMappedReader] = {}
+        for name, path in books_config.names.items():
+            try:
+                readers[name] = self.get_reader(path)
+            except OSError:
+                print(f'Skipping book "{name}" due to error.')
+
+        return readers
+
+    def get_file_index(self, path: str) -> BookFileIndex:
+        real_path = os.path.realpath(path)
+        if (file_index := self.file_indexes.get(real_path)) is not None:
+            return file_index
+
+        file_index = BookFileIndex(self.get_reader(real_path))
+        self.file_indexes[real_path] = file_index
+        return file_index
+
+    def get_index(self, books_config: BooksConfig) -> BookIndex:
+        key = tuple(os.path.realpath(path) for path in books_config.names.values())
+        if (index := self.indexes.get(key)) is not None:
+            return index
+
+        file_indexes: dict[str, BookFileIndex] = {}
+        for name, path in books_config.names.items():
+            try:
+                file_indexes[name] = self.get_file_index(path)
+            except (OSError, ValueError):
+                print(f'Skipping book "{name}" due to error.')
+
+        index = BookIndex(file_indexes)
+        self.indexes[key] = index
+        return index
+
+    def close(self) -> None:
+        self.indexes.clear()
+        self.file_indexes.clear()
+
+        for reader in self.readers.values():
+            reader.close()
+
+        self.readers.clear()
+
+
+book_registry = BookRegistry()
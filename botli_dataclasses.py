@@ -8,6 +8,7 @@ import chess
 import chess.engine
 from chess.polyglot import MemoryMappedReader
 
+from book_registry import BookIndex
 from enums import ChallengeColor, PerfType, Variant
 from utils import find_variant, parse_time_control
 
@@ -31,6 +32,7 @@ class BookSettings:
     max_depth: int | None = None
     allow_repetitions: bool | None = None
     readers: dict[str, MemoryMappedReader] = field(default_factory=dict)
+    index: BookIndex | None = None
 
 
 @dataclass
@@ -385,6 +387,7 @@ class MoveResponse:
     pv: list[chess.Move] = field(default_factory=list, kw_only=True)
     is_draw: bool | None = field(default=None, kw_only=True)
     is_lost: bool | None = field(default=None, kw_only=True)
+    score: chess.engine.PovScore | None = field(default=None, kw_only=True)
     trusted_eval: bool = field(default=False, kw_only=True)
 
 
@@ -393,12 +396,23 @@ class MoveSource:
     method: Callable[[], Awaitable[MoveResponse | None]]
     priority: int
     conditions: list[bool] = field(default_factory=list)
+    is_online: bool = False
+    timeout: int = 0
 
     @property
     def is_available(self) -> bool:
         return all(self.conditions)
 
 
+@dataclass
+class PVReplay:
+    method: Callable[[], Awaitable[MoveResponse | None]]
+    ply: int
+    pv: list[chess.Move]
+    depth: int
+    score: chess.engine.PovScore
+
+
 @dataclass
 class SyzygyResult:
     move: chess.Move
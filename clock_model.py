@@ -0,0 +1,41 @@
+import math
+import statistics
+from collections import deque
+
+LATENCY_SAMPLES = 50
+MIN_SAMPLES = 5
+TAIL_LATENCY_FACTOR = 2.0
+MIN_MOVE_OVERHEAD = 0.5
+
+
+class ClockModel:
+    def __init__(self) -> None:
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def record_latency(self, latency: float) -> None:
+        if math.isfinite(latency):
+            self.latencies.append(latency)
+
+    @property
+    def one_way_latency(self) -> float:
+        if len(self.latencies) < MIN_SAMPLES:
+            return 0.0
+
+        return statistics.median(self.latencies) / 2
+
+    @property
+    def tail_latency(self) -> float | None:
+        if len(self.latencies) < MIN_SAMPLES:
+            return
+
+        latencies = sorted(self.latencies)
+        return latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+
+    def get_move_overhead(self, default_overhead: float, multiplier: float) -> float:
+        if (tail_latency := self.tail_latency) is None:
+            return default_overhead
+
+        return max(tail_latency * TAIL_LATENCY_FACTOR, MIN_MOVE_OVERHEAD) * multiplier
+
+
+clock_model = ClockModel()
@@ -20,6 +20,7 @@ from configs import (
     MatchmakingTypeConfig,
     MessagesConfig,
     OfferDrawConfig,
+    OnlineCacheConfig,
     OnlineEGTBConfig,
     OnlineMovesConfig,
     OpeningBooksConfig,
@@ -168,6 +169,25 @@ class Config:
 
             limits_settings = settings["limits"] or {}
 
+            for field_name in ("pool_size", "max_games"):
+                if not isinstance(settings.get(field_name, 0), int):
+                    raise TypeError(f'`engine.{key}` subsection "{field_name}" must be an integer.')
+
+            if settings.get("info_level", "all") not in ("basic", "score", "pv", "all"):
+                raise TypeError(
+                    f'`engine.{key}` subsection "info_level" must be one of "basic", "score", "pv" or "all".'
+                )
+
+            eval_files = settings.get("eval_files") or {}
+            if not isinstance(eval_files, dict) or not all(isinstance(path, str) for path in eval_files.values()):
+                raise TypeError(
+                    f'`engine.{key}` subsection "eval_files" must be a dictionary of variants and quoted net files.'
+                )
+
+            for field_name in ("cpu_affinity", "lower_ponder_priority", "final_info_only"):
+                if not isinstance(settings.get(field_name, False), bool):
+                    raise TypeError(f'`engine.{key}` subsection "{field_name}" must be a bool.')
+
             engine_configs[key] = EngineConfig(
                 settings["path"],
                 settings["ponder"],
@@ -175,6 +195,13 @@ class Config:
                 settings["move_overhead_multiplier"],
                 settings["uci_options"] or {},
                 LimitConfig(limits_settings.get("time"), limits_settings.get("depth"), limits_settings.get("nodes")),
+                settings.get("pool_size", 0),
+                settings.get("max_games", 50),
+                settings.get("cpu_affinity", False),
+                settings.get("lower_ponder_priority", False),
+                settings.get("info_level", "all"),
+                settings.get("final_info_only", False),
+                eval_files,
             )
 
         return engine_configs
@@ -193,15 +220,19 @@ class Config:
             Config._validate_config_section(settings, f"syzygy.{key}", syzygy_sections)
 
             if not settings["enabled"]:
-                syzygy_configs[key] = SyzygyConfig(False, [], 0, False)
+                syzygy_configs[key] = SyzygyConfig(False, [], 0, False, 0)
                 continue
 
             for path in settings["paths"]:
                 if not os.path.isdir(path):
                     raise RuntimeError(f'Your {key} syzygy path "{path}" is not a directory.')
 
+            warm_up_mb = settings.get("warm_up_mb", 0)
+            if not isinstance(warm_up_mb, int):
+                raise TypeError(f'`syzygy.{key}` subsection "warm_up_mb" must be an integer.')
+
             syzygy_configs[key] = SyzygyConfig(
-                settings["enabled"], settings["paths"], settings["max_pieces"], settings["instant_play"]
+                settings["enabled"], settings["paths"], settings["max_pieces"], settings["instant_play"], warm_up_mb
             )
 
         return syzygy_configs
@@ -376,7 +407,29 @@ class Config:
         )
 
     @staticmethod
-    def _get_online_moves_config(online_moves_section: dict[str, dict[str, Any]]) -> OnlineMovesConfig:
+    def _get_online_cache_config(online_cache_section: dict[str, Any]) -> OnlineCacheConfig:
+        if not online_cache_section.get("enabled"):
+            return OnlineCacheConfig(False, "", 0, 0, {})
+
+        online_cache_sections: list[tuple[str, type | UnionType, str]] = [
+            ("path", str, '"path" must be a string wrapped in quotes.'),
+            ("max_size_mb", int, '"max_size_mb" must be an integer.'),
+            ("negative_ttl", int, '"negative_ttl" must be an integer.'),
+            ("ttls", dict, '"ttls" must be a dictionary with indented keys followed by colons.'),
+        ]
+
+        Config._validate_config_section(online_cache_section, "online_moves.cache", online_cache_sections)
+
+        return OnlineCacheConfig(
+            True,
+            online_cache_section["path"],
+            online_cache_section["max_size_mb"],
+            online_cache_section["negative_ttl"],
+            online_cache_section["ttls"],
+        )
+
+    @staticmethod
+    def _get_online_moves_config(online_moves_section: dict[str, Any]) -> OnlineMovesConfig:
         online_moves_sections: list[tuple[str, type | UnionType, str]] = [
             (
                 "opening_explorer",
@@ -395,6 +448,10 @@ class Config:
             Config._get_lichess_cloud_config(online_moves_section["lichess_cloud"]),
             Config._get_chessdb_config(online_moves_section["chessdb"]),
             Config._get_online_egtb_config(online_moves_section["online_egtb"]),
+            Config._get_online_cache_config(online_moves_section.get("cache") or {}),
+            online_moves_section.get("concurrent", False),
+            online_moves_section.get("race_engine", False),
+            online_moves_section.get("prefetch", False),
         )
 
     @staticmethod
@@ -17,6 +17,13 @@ class EngineConfig:
     move_overhead_multiplier: float
     uci_options: dict[str, Any]
     limits: LimitConfig
+    pool_size: int
+    max_games: int
+    cpu_affinity: bool
+    lower_ponder_priority: bool
+    info_level: str
+    final_info_only: bool
+    eval_files: dict[str, str]
 
 
 @dataclass
@@ -25,6 +32,7 @@ class SyzygyConfig:
     paths: list[str]
     max_pieces: int
     instant_play: bool
+    warm_up_mb: int
 
 
 @dataclass
@@ -104,12 +112,25 @@ class OnlineEGTBConfig:
     timeout: int
 
 
+@dataclass
+class OnlineCacheConfig:
+    enabled: bool
+    path: str
+    max_size_mb: int
+    negative_ttl: int
+    ttls: dict[str, int]
+
+
 @dataclass
 class OnlineMovesConfig:
     opening_explorer: OpeningExplorerConfig
     lichess_cloud: LichessCloudConfig
     chessdb: ChessDBConfig
     online_egtb: OnlineEGTBConfig
+    cache: OnlineCacheConfig
+    concurrent: bool
+    race_engine: bool
+    prefetch: bool
 
 
 @dataclass
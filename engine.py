@@ -1,47 +1,115 @@
 import asyncio
 import os
 import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any
 
 import chess
 import chess.engine
+import psutil
 
 from configs import EngineConfig, LimitConfig, SyzygyConfig
+from resource_governor import resource_governor
+
+if sys.platform != "win32":
+    import resource
+
+PONDER_NICE = 10
+INFO_LEVELS = {
+    "basic": chess.engine.INFO_BASIC,
+    "score": chess.engine.INFO_BASIC | chess.engine.INFO_SCORE,
+    "pv": chess.engine.INFO_BASIC | chess.engine.INFO_SCORE | chess.engine.INFO_PV,
+    "all": chess.engine.INFO_ALL,
+}
+
+
+class InfoUciProtocol(chess.engine.UciProtocol):
+    def __init__(self) -> None:
+        super().__init__()
+        self.last_pv: list[str] = []
+        self.final_pv: list[str] = []
+
+    def line_received(self, line: str) -> None:
+        if line.startswith("info ") and " pv " in line and (" multipv " not in line or " multipv 1 " in line):
+            self.last_pv = line.split(" pv ", 1)[1].split()
+        elif line.startswith("bestmove"):
+            self.final_pv = self.last_pv
+            self.last_pv = []
 
 
 class Engine:
     def __init__(
         self,
         transport: asyncio.SubprocessTransport,
-        engine: chess.engine.UciProtocol,
+        engine: InfoUciProtocol,
         ponder: bool,
         opponent: chess.engine.Opponent,
         limit_config: LimitConfig,
+        lower_ponder_priority: bool,
+        info_level: chess.engine.Info,
+        final_info_only: bool,
     ) -> None:
         self.transport = transport
         self.engine = engine
         self.ponder = ponder
         self.opponent = opponent
         self.limit_config = limit_config
+        self.info_level = info_level
+        self.final_info_only = final_info_only
+        self.games = 1
+        self.ponder_analysis: chess.engine.AnalysisResult | None = None
+        self.ponder_drain_task: asyncio.Task[None] | None = None
+        self.reservation_id: int | None = None
+        self.eval_file = ""
+        self.cpus: list[int] = []
+        self.lower_ponder_priority = lower_ponder_priority
+        self.default_nice: int | None = None
+        self.ponder_nice: int | None = None
+        self.ponder_board: chess.Board | None = None
+        self.ponder_start_time = 0.0
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self.ponder_time_saved = 0.0
 
     @classmethod
     async def from_config(
-        cls, engine_config: EngineConfig, syzygy_config: SyzygyConfig, opponent: chess.engine.Opponent
+        cls,
+        engine_config: EngineConfig,
+        syzygy_config: SyzygyConfig,
+        opponent: chess.engine.Opponent,
+        options: dict[str, Any],
     ) -> "Engine":
         stderr = subprocess.DEVNULL if engine_config.silence_stderr else None
 
-        transport, engine = await chess.engine.popen_uci(engine_config.path, stderr=stderr)
+        transport, engine = await InfoUciProtocol.popen(engine_config.path, stderr=stderr)
+        try:
+            await engine.initialize()
+        except BaseException:
+            transport.close()
+            raise
 
-        await cls._configure_engine(engine, engine_config, syzygy_config)
+        await cls._configure_engine(engine, engine_config, syzygy_config, options)
         await engine.send_opponent_information(opponent=opponent)
 
-        return cls(transport, engine, engine_config.ponder, opponent, engine_config.limits)
+        return cls(
+            transport,
+            engine,
+            engine_config.ponder,
+            opponent,
+            engine_config.limits,
+            engine_config.lower_ponder_priority,
+            INFO_LEVELS[engine_config.info_level],
+            engine_config.final_info_only,
+        )
 
     @classmethod
     async def test(cls, engine_config: EngineConfig) -> None:
         stderr = subprocess.DEVNULL if engine_config.silence_stderr else None
 
         transport, engine = await chess.engine.popen_uci(engine_config.path, stderr=stderr)
-        await cls._configure_engine(engine, engine_config, SyzygyConfig(False, [], 0, False))
+        await cls._configure_engine(engine, engine_config, SyzygyConfig(False, [], 0, False, 0), {})
         result = await engine.play(chess.Board(), chess.engine.Limit(time=0.1), info=chess.engine.INFO_ALL)
 
         if not result.move:
@@ -52,9 +120,12 @@ class Engine:
 
     @staticmethod
     async def _configure_engine(
-        engine: chess.engine.UciProtocol, engine_config: EngineConfig, syzygy_config: SyzygyConfig
+        engine: chess.engine.UciProtocol,
+        engine_config: EngineConfig,
+        syzygy_config: SyzygyConfig,
+        options: dict[str, Any],
     ) -> None:
-        for name, value in engine_config.uci_options.items():
+        for name, value in (engine_config.uci_options | options).items():
             if name.lower() in chess.engine.MANAGED_OPTIONS:
                 print(f'UCI option "{name}" ignored as it is managed by the bot.')
             elif name in engine.options:
@@ -76,6 +147,102 @@ class Engine:
     def name(self) -> str:
         return self.engine.id["name"]
 
+    @property
+    def cpu_list(self) -> str:
+        ranges: list[list[int]] = []
+        for cpu in self.cpus:
+            if ranges and ranges[-1][1] == cpu - 1:
+                ranges[-1][1] = cpu
+            else:
+                ranges.append([cpu, cpu])
+
+        return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+    def set_affinity(self, cpus: list[int]) -> None:
+        if cpus == self.cpus:
+            return
+
+        try:
+            process = psutil.Process(self.transport.get_pid())
+            if sys.platform == "linux":
+                for thread in process.threads():
+                    os.sched_setaffinity(thread.id, cpus or resource_governor.cpus)
+            else:
+                process.cpu_affinity(cpus or resource_governor.cpus)
+        except (psutil.Error, OSError) as e:
+            print(f"Engine CPU affinity could not be changed: {e}")
+            return
+
+        self.cpus = cpus
+        print(f"Engine pinned to CPUs {self.cpu_list}." if cpus else "Engine CPU affinity cleared.")
+
+    @property
+    def ponder_stats(self) -> str | None:
+        if not (ponder_count := self.ponder_hits + self.ponder_misses):
+            return
+
+        hit_rate = self.ponder_hits / ponder_count * 100
+        return (
+            f"Ponder: {self.ponder_hits}/{ponder_count} hits ({hit_rate:.1f} %), "
+            f"{self.ponder_time_saved:.1f} seconds saved."
+        )
+
+    def _record_ponder_result(self, board: chess.Board, ponder: bool) -> None:
+        if self.ponder_board is None:
+            return
+
+        if ponder and board.move_stack == self.ponder_board.move_stack and board == self.ponder_board:
+            self.ponder_hits += 1
+            self.ponder_time_saved += time.perf_counter() - self.ponder_start_time
+        else:
+            self.ponder_misses += 1
+
+        self.ponder_board = None
+
+    def _set_ponder_priority(self, is_pondering: bool) -> None:
+        if not self.lower_ponder_priority or is_pondering == (self.default_nice is not None):
+            return
+
+        try:
+            process = psutil.Process(self.transport.get_pid())
+            if is_pondering:
+                default_nice = process.nice()
+                if not self._can_restore_priority(default_nice):
+                    print("Engine ponder priority not lowered as it could not be restored without privileges.")
+                    self.lower_ponder_priority = False
+                    return
+
+                nice = psutil.BELOW_NORMAL_PRIORITY_CLASS if sys.platform == "win32" else default_nice + PONDER_NICE
+            else:
+                default_nice = None
+                nice = self.default_nice
+
+            if sys.platform == "linux":
+                for thread in process.threads():
+                    os.setpriority(os.PRIO_PROCESS, thread.id, nice)
+            else:
+                process.nice(nice)
+        except (psutil.Error, OSError) as e:
+            print(f"Engine ponder priority could not be changed: {e}")
+            self.lower_ponder_priority = False
+            return
+
+        self.default_nice = default_nice
+        if is_pondering and nice != self.ponder_nice:
+            print(f"Engine priority set to {nice} while pondering.")
+            self.ponder_nice = nice
+
+    @staticmethod
+    def _can_restore_priority(default_nice: int) -> bool:
+        if sys.platform == "win32" or os.geteuid() == 0:
+            return True
+
+        if not hasattr(resource, "RLIMIT_NICE"):
+            return False
+
+        nice_limit, _ = resource.getrlimit(resource.RLIMIT_NICE)
+        return nice_limit == resource.RLIM_INFINITY or default_nice >= 20 - nice_limit
+
     async def make_move(
         self, board: chess.Board, white_time: float, black_time: float, increment: float
     ) -> tuple[chess.Move, chess.engine.InfoDict]:
@@ -98,21 +265,97 @@ class Engine:
             )
             ponder = self.ponder
 
-        result = await self.engine.play(board, limit, info=chess.engine.INFO_ALL, ponder=ponder)
+        self._set_ponder_priority(False)
+        self._record_ponder_result(board, ponder)
+        info = (
+            self.info_level & (chess.engine.INFO_BASIC | chess.engine.INFO_SCORE)
+            if self.final_info_only
+            else self.info_level
+        )
+        result = await self.engine.play(board, limit, info=info, ponder=ponder, game=self.games)
+        if ponder and result.move and result.ponder:
+            self.ponder_board = board.copy(stack=True)
+            self.ponder_board.push(result.move)
+            self.ponder_board.push(result.ponder)
+            self.ponder_start_time = time.perf_counter()
+            self._set_ponder_priority(True)
 
         if not result.move:
             raise RuntimeError("Engine could not make a move!")
 
+        if self.final_info_only and self.info_level & chess.engine.INFO_PV and self.engine.final_pv:
+            result.info["pv"] = self._parse_pv(board, self.engine.final_pv)
+
         return result.move, result.info
 
+    @staticmethod
+    def _parse_pv(board: chess.Board, pv: list[str]) -> list[chess.Move]:
+        board = board.copy(stack=False)
+        moves: list[chess.Move] = []
+        for uci_move in pv:
+            try:
+                moves.append(board.push_uci(uci_move))
+            except ValueError:
+                break
+
+        return moves
+
     async def start_pondering(self, board: chess.Board) -> None:
         if self.ponder:
-            await self.engine.analysis(board)
+            self.ponder_board = None
+            await self._start_ponder_analysis(board)
+            self._set_ponder_priority(True)
 
     async def stop_pondering(self, board: chess.Board) -> None:
         if self.ponder:
             self.ponder = False
-            await self.engine.analysis(board, chess.engine.Limit(time=0.001))
+            self.ponder_board = None
+            await self._start_ponder_analysis(board, chess.engine.Limit(time=0.001))
+            self._set_ponder_priority(False)
+
+    async def _start_ponder_analysis(self, board: chess.Board, limit: chess.engine.Limit | None = None) -> None:
+        self.ponder_analysis = await self.engine.analysis(
+            board, limit, info=chess.engine.INFO_SCORE | chess.engine.INFO_PV, game=self.games
+        )
+        self.ponder_drain_task = asyncio.create_task(self._drain_ponder_analysis(self.ponder_analysis))
+
+    @staticmethod
+    async def _drain_ponder_analysis(analysis: chess.engine.AnalysisResult) -> None:
+        async for _ in analysis:
+            pass
+
+    async def reset(
+        self, engine_config: EngineConfig, opponent: chess.engine.Opponent, options: dict[str, Any]
+    ) -> None:
+        self.games += 1
+        self.ponder = engine_config.ponder
+        self.opponent = opponent
+        self.lower_ponder_priority = engine_config.lower_ponder_priority
+        self.info_level = INFO_LEVELS[engine_config.info_level]
+        self.final_info_only = engine_config.final_info_only
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self.ponder_time_saved = 0.0
+        await self.engine.configure({name: value for name, value in options.items() if name in self.engine.options})
+        await self.engine.send_opponent_information(opponent=opponent)
+
+    async def is_healthy(self) -> bool:
+        if self.transport.get_returncode() is not None:
+            return False
+
+        if self.ponder_analysis:
+            self.ponder_analysis.stop()
+            self.ponder_analysis = None
+
+        self.ponder_board = None
+        self._set_ponder_priority(False)
+
+        try:
+            await asyncio.wait_for(self.engine.ping(), 5.0)
+        except (chess.engine.EngineError, chess.engine.EngineTerminatedError, TimeoutError):
+            return False
+
+        return True
 
     async def close(self) -> None:
         try:
@@ -121,3 +364,87 @@ class Engine:
             print("Engine could not be terminated cleanly.")
 
         self.transport.close()
+
+
+class EnginePool:
+    def __init__(self) -> None:
+        self.idle_engines: defaultdict[tuple[str, str, tuple[str, ...], int], list[Engine]] = defaultdict(list)
+
+    async def acquire(
+        self,
+        engine_key: str,
+        engine_config: EngineConfig,
+        syzygy_config: SyzygyConfig,
+        opponent: chess.engine.Opponent,
+        uci_variant: str,
+    ) -> Engine:
+        reservation_id, options, cpus = resource_governor.reserve(engine_config)
+        eval_file = engine_config.eval_files.get(uci_variant, "")
+        if eval_file:
+            options["EvalFile"] = eval_file
+
+        try:
+            engine = await self._get_engine(engine_key, engine_config, syzygy_config, opponent, options, eval_file)
+        except BaseException:
+            resource_governor.release(reservation_id)
+            raise
+
+        engine.reservation_id = reservation_id
+        engine.eval_file = eval_file
+        engine.set_affinity(cpus)
+        return engine
+
+    async def _get_engine(
+        self,
+        engine_key: str,
+        engine_config: EngineConfig,
+        syzygy_config: SyzygyConfig,
+        opponent: chess.engine.Opponent,
+        options: dict[str, Any],
+        eval_file: str,
+    ) -> Engine:
+        idle_engines = self.idle_engines[self._get_key(engine_key, eval_file, syzygy_config)]
+        while idle_engines:
+            engine = idle_engines.pop()
+            if await engine.is_healthy():
+                await engine.reset(engine_config, opponent, options)
+                return engine
+
+            await engine.close()
+
+        return await Engine.from_config(engine_config, syzygy_config, opponent, options)
+
+    async def release(
+        self, engine_key: str, engine_config: EngineConfig, syzygy_config: SyzygyConfig, engine: Engine
+    ) -> None:
+        if engine.reservation_id is not None:
+            resource_governor.release(engine.reservation_id)
+            engine.reservation_id = None
+
+        idle_engines = self.idle_engines[self._get_key(engine_key, engine.eval_file, syzygy_config)]
+        if (
+            len(idle_engines) >= engine_config.pool_size
+            or engine.games >= engine_config.max_games
+            or not await engine.is_healthy()
+        ):
+            await engine.close()
+            return
+
+        idle_engines.append(engine)
+
+    async def close(self) -> None:
+        for idle_engines in self.idle_engines.values():
+            for engine in idle_engines:
+                await engine.close()
+
+        self.idle_engines.clear()
+
+    @staticmethod
+    def _get_key(engine_key: str, eval_file: str, syzygy_config: SyzygyConfig) -> tuple[str, str, tuple[str, ...], int]:
+        if not syzygy_config.enabled:
+            return engine_key, eval_file, (), 0
+
+        return engine_key, eval_file, tuple(syzygy_config.paths), syzygy_config.max_pieces
+
+
+engine_pool = EnginePool()
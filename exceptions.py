@@ -1,2 +1,6 @@
 class NoOpponentError(Exception):
     pass
+
+
+class SourceUnavailableError(Exception):
+    pass
@@ -1,10 +1,12 @@
 import asyncio
+import time
 import chess
 from typing import Any
 from datetime import datetime
 from api import API
 from botli_dataclasses import GameInformation
 from chatter import Chatter
+from clock_model import clock_model
 from config import Config
 from lichess_game import LichessGame
 import json, os
@@ -39,8 +41,10 @@ class Game:
     async def run(self) -> None:
         game_stream_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
         self._task = asyncio.create_task(self.api.get_game_stream(self.game_id, game_stream_queue))
-        info = GameInformation.from_game_full_event(await game_stream_queue.get())
-        lichess_game = await LichessGame.acreate(self.api, self.config, self.username, info)
+        game_full_event = await game_stream_queue.get()
+        clock_time = time.perf_counter()
+        info = GameInformation.from_game_full_event(game_full_event)
+        lichess_game = await LichessGame.acreate(self.api, self.config, self.username, info, clock_time)
         chatter = Chatter(self.api, self.config, self.username, info, lichess_game)
 
         self._print_game_information(info)
@@ -59,6 +63,9 @@ class Game:
             await lichess_game.close()
             return
 
+        if clock_model.tail_latency is None:
+            await self.api.ping()
+
         await chatter.send_greetings()
 
         if lichess_game.is_our_turn:
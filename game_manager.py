@@ -4,11 +4,14 @@ from collections import deque
 from typing import Any
 
 from api import API
+from book_registry import book_registry
 from botli_dataclasses import Challenge, ChallengeRequest, Tournament, TournamentRequest
 from challenger import Challenger
 from config import Config
+from engine import engine_pool
 from game import Game
 from matchmaking import Matchmaking
+from tablebase_registry import tablebase_registry
 from utils import get_future_timestamp
 
 
@@ -81,6 +84,10 @@ class GameManager:
         for task in list(self.tasks):
             await task
 
+        await engine_pool.close()
+        book_registry.close()
+        tablebase_registry.close()
+
     @property
     def is_busy(self) -> bool:
         return len(self.tasks) + len(self.tournaments) + self.reserved_game_spots >= self.config.challenge.concurrency
@@ -1,11 +1,12 @@
+import asyncio
 import itertools
 import random
-import struct
 import time
-from collections.abc import Awaitable, Callable, Iterable
+from collections import Counter
+from collections.abc import Awaitable, Callable, Hashable, Iterable
 from itertools import islice
 from operator import itemgetter
-from typing import Any, Literal
+from typing import Any, Literal, TypeVar
 
 import chess
 import chess.engine
@@ -15,6 +16,7 @@ import chess.syzygy
 from chess.variant import find_variant
 
 from api import API
+from book_registry import book_registry
 from botli_dataclasses import (
     BookSettings,
     GameInformation,
@@ -22,12 +24,20 @@ from botli_dataclasses import (
     LichessMove,
     MoveResponse,
     MoveSource,
+    PVReplay,
     SyzygyResult,
 )
+from clock_model import clock_model
 from config import Config
 from configs import EngineConfig, SyzygyConfig
-from engine import Engine
+from engine import Engine, engine_pool
 from enums import Variant
+from exceptions import SourceUnavailableError
+from source_health import source_health
+from tablebase_registry import tablebase_registry
+
+TABLEBASE_PROBE_TIMEOUT = 2.0
+ProbeResultT = TypeVar("ProbeResultT", GaviotaResult, SyzygyResult)
 
 
 class LichessGame:
@@ -41,14 +51,22 @@ class LichessGame:
         syzygy_config: SyzygyConfig,
         engine_key: str,
         engine: Engine,
+        clock_time: float,
     ) -> None:
         self.api = api
         self.config = config
         self.game_info = game_info
         self.board = board
+        self.position_keys: list[int] = []
+        self.transposition_keys: list[Hashable] = []
+        self.position_counts: Counter[Hashable] = Counter()
+        self.uci_moves = [move.uci() for move in board.move_stack]
+        self._init_position_keys()
+        self._fen: str | None = None
         self.syzygy_config = syzygy_config
         self.white_time: float = self.game_info.state["wtime"] / 1000
         self.black_time: float = self.game_info.state["btime"] / 1000
+        self.clock_time = clock_time
         self.white_offered_draw: bool = False
         self.black_offered_draw: bool = False
         self.increment = self.game_info.increment_ms / 1000
@@ -56,32 +74,50 @@ class LichessGame:
         self.book_settings = self._get_book_settings()
         self.syzygy_tablebase = self._get_syzygy_tablebase()
         self.gaviota_tablebase = self._get_gaviota_tablebase()
+        self.syzygy_signatures = (
+            tablebase_registry.get_syzygy_signatures(self.syzygy_config, type(self.board))
+            if self.syzygy_tablebase
+            else {}
+        )
+        self.warmed_syzygy_signatures: set[str] = set()
+        self.gaviota_signatures = (
+            tablebase_registry.get_gaviota_signatures(self.config.gaviota) if self.gaviota_tablebase else set()
+        )
         self.move_sources = self._get_move_sources()
 
-        self.opening_explorer_counter = 0
+        self.move_counts: Counter[Callable[[], Awaitable[MoveResponse | None]]] = Counter()
         self.out_of_opening_explorer_counter = 0
-        self.cloud_counter = 0
         self.out_of_cloud_counter = 0
-        self.chessdb_counter = 0
         self.out_of_chessdb_counter = 0
+        self.prefetch_tasks: dict[tuple[str, str], asyncio.Task[dict[str, Any] | None]] = {}
+        self.pv_replay: PVReplay | None = None
+        self.egtb_mainline: list[str] = []
+        self.egtb_mainline_ply = 0
+        self.egtb_mainline_task: asyncio.Task[dict[str, Any] | None] | None = None
+        self.engine_key = engine_key
         self.move_overhead = self._get_move_overhead(config.engines[engine_key])
         self.engine = engine
+        self.engine_task: asyncio.Task[tuple[chess.Move, chess.engine.InfoDict]] | None = None
         self.scores: list[chess.engine.PovScore] = []
         self.last_message = "No eval available yet."
         self.last_pv: list[chess.Move] = []
 
     @classmethod
-    async def acreate(cls, api: API, config: Config, username: str, game_info: GameInformation) -> "LichessGame":
+    async def acreate(
+        cls, api: API, config: Config, username: str, game_info: GameInformation, clock_time: float
+    ) -> "LichessGame":
         board = cls._get_board(game_info)
         is_white = game_info.white_name == username
         engine_key = cls._get_engine_key(config, board, is_white, game_info)
         syzygy_config = cls._get_syzygy_config(config, board)
-        engine = await Engine.from_config(
+        engine = await engine_pool.acquire(
+            engine_key,
             config.engines[engine_key],
             syzygy_config,
             game_info.black_opponent if is_white else game_info.white_opponent,
+            board.uci_variant,
         )
-        return cls(api, config, username, game_info, board, syzygy_config, engine_key, engine)
+        return cls(api, config, username, game_info, board, syzygy_config, engine_key, engine, clock_time)
 
     @staticmethod
     def _get_board(game_info: GameInformation) -> chess.Board:
@@ -151,24 +187,38 @@ class LichessGame:
             case "atomic":
                 return config.syzygy["atomic"]
             case _:
-                return SyzygyConfig(False, [], 0, False)
+                return SyzygyConfig(False, [], 0, False, 0)
 
     async def make_move(self) -> LichessMove:
-        for move_source in self.move_sources:
-            if move_response := await move_source():
-                self.board.push(move_response.move)
-                await self.engine.start_pondering(self.board)
-
-                print(f"{move_response.public_message} {move_response.private_message}".strip())
-                self.last_message = move_response.public_message
-                self.last_pv = move_response.pv
-                return LichessMove(
-                    move_response.move.uci(),
-                    self._offer_draw(move_response.trusted_eval, move_response.is_draw),
-                    self._resign(move_response.trusted_eval, move_response.is_lost),
-                )
+        start_time = time.perf_counter()
+        self._reduce_own_time(start_time - self.clock_time + clock_model.one_way_latency)
+        try:
+            move_response = await self._get_move_response(start_time)
+        except asyncio.CancelledError:
+            self._cancel_engine_search()
+            raise
+
+        if move_response:
+            self._cancel_engine_search()
+            if move_response.score and move_response.trusted_eval:
+                self.scores.append(move_response.score)
+
+            self._push(move_response.move)
+            await self.engine.start_pondering(self.board)
 
-        move, info = await self.engine.make_move(self.board, *self.engine_times)
+            print(f"{move_response.public_message} {move_response.private_message}".strip())
+            self.last_message = move_response.public_message
+            self.last_pv = move_response.pv
+            self._prefetch_online_moves()
+            return LichessMove(
+                move_response.move.uci(),
+                self._offer_draw(move_response.trusted_eval, move_response.is_draw),
+                self._resign(move_response.trusted_eval, move_response.is_lost),
+            )
+
+        engine_task = self.engine_task or self._start_engine_search(start_time)
+        self.engine_task = None
+        move, info = await engine_task
 
         if "score" in info:
             self.scores.append(info["score"])
@@ -178,36 +228,189 @@ class LichessGame:
         self.last_message = message
         self.last_pv = info.get("pv", [])
 
-        self.board.push(move)
+        self._push(move)
         if len(self.board.move_stack) <= 2:
             await self.engine.start_pondering(self.board)
 
+        self._prefetch_online_moves()
         return LichessMove(move.uci(), self._offer_draw(), self._resign())
 
+    def _start_engine_search(self, start_time: float) -> asyncio.Task[tuple[chess.Move, chess.engine.InfoDict]]:
+        self._reduce_own_time(time.perf_counter() - start_time)
+        self.engine_task = asyncio.create_task(self.engine.make_move(self.board.copy(), *self.engine_times))
+        return self.engine_task
+
+    def _cancel_engine_search(self) -> None:
+        if self.engine_task:
+            self.engine_task.cancel()
+            self.engine_task = None
+
+    async def _get_move_response(self, start_time: float) -> MoveResponse | None:
+        online_sources: list[MoveSource] = []
+        last_local_index = max(
+            (index for index, move_source in enumerate(self.move_sources) if not move_source.is_online), default=-1
+        )
+        for index, move_source in enumerate(self.move_sources):
+            if (
+                index > last_local_index
+                and move_source.is_online
+                and self.config.online_moves.race_engine
+                and not self.engine_task
+            ):
+                self._start_engine_search(start_time)
+
+            if self.config.online_moves.concurrent and move_source.is_online:
+                online_sources.append(move_source)
+                continue
+
+            if online_sources:
+                if move_response := await self._race_move_sources(online_sources):
+                    return move_response
+
+                online_sources.clear()
+
+            if move_response := await self._call_move_source(move_source):
+                return move_response
+
+        if online_sources:
+            return await self._race_move_sources(online_sources)
+
+    async def _call_move_source(self, move_source: MoveSource) -> MoveResponse | None:
+        if move_response := await move_source.method():
+            self.move_counts[move_source.method] += 1
+            return move_response
+
+    async def _race_move_sources(self, move_sources: list[MoveSource]) -> MoveResponse | None:
+        if len(move_sources) == 1:
+            return await self._call_move_source(move_sources[0])
+
+        tasks = [asyncio.create_task(move_source.method()) for move_source in move_sources]
+        try:
+            async with asyncio.timeout(max(move_source.timeout for move_source in move_sources)):
+                for move_source, task in zip(move_sources, tasks):
+                    if move_response := await task:
+                        self.move_counts[move_source.method] += 1
+                        return move_response
+        except TimeoutError:
+            for move_source, task in zip(move_sources, tasks):
+                if task.done() and not task.cancelled() and (move_response := task.result()):
+                    self.move_counts[move_source.method] += 1
+                    return move_response
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     def update(self, game_state_event: dict[str, Any]) -> bool:
         self.white_time = game_state_event["wtime"] / 1000
         self.black_time = game_state_event["btime"] / 1000
+        self.clock_time = time.perf_counter()
         self.white_offered_draw = game_state_event.get("wdraw", False)
         self.black_offered_draw = game_state_event.get("bdraw", False)
 
         moves = game_state_event["moves"].split()
-        if len(moves) > len(self.board.move_stack):
-            self.board.push(chess.Move.from_uci(moves[-1]))
-            return True
+        common_length = self._get_common_length(moves)
+        local_length = len(self.board.move_stack)
+        if common_length == len(moves) and (common_length == local_length or self._is_pending_move(moves)):
+            return False
+
+        if local_length > common_length:
+            self.last_pv.clear()
+            while len(self.board.move_stack) > common_length:
+                self._pop()
 
-        return False
+        for uci_move in moves[common_length:]:
+            self._push(chess.Move.from_uci(uci_move), uci_move)
+
+        return self.is_our_turn
+
+    def _prefetch_online_moves(self) -> None:
+        self._cancel_prefetch()
+
+        if not self.config.online_moves.prefetch or len(self.last_pv) < 2:
+            return
+
+        if not self.board.is_legal(self.last_pv[1]):
+            return
+
+        board = self.board.copy(stack=False)
+        board.push(self.last_pv[1])
+        if board.is_game_over():
+            return
+
+        methods = {move_source.method for move_source in self.move_sources}
+        move_stack = [*self.board.move_stack, self.last_pv[1]]
+        if (
+            self._make_cloud_move in methods
+            and self._is_cloud_allowed(board)
+            and self._get_pv_replay_index(
+                self._make_cloud_move, move_stack, self.config.online_moves.lichess_cloud.min_eval_depth
+            )
+            is None
+            and source_health.is_available("lichess_cloud", self.config.online_moves.lichess_cloud.timeout)
+        ):
+            fen = board.fen().replace("[", "/").replace("]", "")
+            self.prefetch_tasks[("cloud", fen)] = asyncio.create_task(
+                self.api.get_cloud_eval(fen, self.game_info.variant, self.config.online_moves.lichess_cloud.timeout)
+            )
+
+        if (
+            self._make_chessdb_move in methods
+            and self._is_chessdb_allowed(board)
+            and self._get_pv_replay_index(self._make_chessdb_move, move_stack, 0) is None
+            and source_health.is_available("chessdb", self.config.online_moves.chessdb.timeout)
+        ):
+            fen = board.fen(shredder=board.chess960)
+            self.prefetch_tasks[("chessdb", fen)] = asyncio.create_task(
+                self.api.get_chessdb_eval(
+                    fen, self.config.online_moves.chessdb.best_move, self.config.online_moves.chessdb.timeout
+                )
+            )
+
+    def _cancel_prefetch(self) -> None:
+        for task in self.prefetch_tasks.values():
+            if not task.cancel() and not task.cancelled():
+                task.exception()
+
+        self.prefetch_tasks.clear()
+
+    def _get_common_length(self, moves: list[str]) -> int:
+        length = min(len(moves), len(self.uci_moves))
+        if moves[:length] == self.uci_moves[:length]:
+            return length
+
+        for index, (uci_move, local_uci_move) in enumerate(zip(moves, self.uci_moves)):
+            if uci_move != local_uci_move:
+                return index
+
+        return length
+
+    def _is_pending_move(self, moves: list[str]) -> bool:
+        return len(self.board.move_stack) == len(moves) + 1 and not self.is_our_turn
 
     async def takeback(self) -> None:
-        self.board.pop()
+        self._pop()
         if self.is_our_turn:
-            self.board.pop()
+            self._pop()
         self.last_pv.clear()
+        self._cancel_prefetch()
         await self.start_pondering()
 
     @property
     def is_our_turn(self) -> bool:
         return self.is_white == self.board.turn
 
+    @property
+    def position_key(self) -> int:
+        return self.position_keys[-1]
+
+    @property
+    def fen(self) -> str:
+        if self._fen is None:
+            self._fen = self.board.fen()
+
+        return self._fen
+
     @property
     def is_abortable(self) -> bool:
         return len(self.board.move_stack) < 2
@@ -230,16 +433,19 @@ class LichessGame:
 
     @property
     def engine_times(self) -> tuple[float, float, float]:
+        move_overhead = clock_model.get_move_overhead(
+            self.move_overhead, self.config.engines[self.engine_key].move_overhead_multiplier
+        )
         if self.is_white:
-            if self.white_time > self.move_overhead:
-                white_time = self.white_time - self.move_overhead
+            if self.white_time > move_overhead:
+                white_time = self.white_time - move_overhead
             else:
                 white_time = self.white_time / 2.0
 
             return white_time, self.black_time, self.increment
 
-        if self.black_time > self.move_overhead:
-            black_time = self.black_time - self.move_overhead
+        if self.black_time > move_overhead:
+            black_time = self.black_time - move_overhead
         else:
             black_time = self.black_time / 2.0
 
@@ -249,16 +455,15 @@ class LichessGame:
         await self.engine.start_pondering(self.board)
 
     async def close(self) -> None:
-        await self.engine.close()
-
-        for book_reader in self.book_settings.readers.values():
-            book_reader.close()
-
-        if self.syzygy_tablebase:
-            self.syzygy_tablebase.close()
-
-        if self.gaviota_tablebase:
-            self.gaviota_tablebase.close()
+        self._cancel_engine_search()
+        self._cancel_prefetch()
+        if self.egtb_mainline_task:
+            self.egtb_mainline_task.cancel()
+        if ponder_stats := self.engine.ponder_stats:
+            print(ponder_stats)
+        await engine_pool.release(
+            self.engine_key, self.config.engines[self.engine_key], self.syzygy_config, self.engine
+        )
 
     def _offer_draw(self, is_trusted: bool = True, is_draw: bool | None = None) -> bool:
         if not self.config.offer_draw.enabled:
@@ -332,16 +537,10 @@ class LichessGame:
         if self.book_settings.max_depth and self.board.ply() >= self.book_settings.max_depth:
             return
 
-        for name, book_reader in self.book_settings.readers.items():
-            try:
-                entries = list(book_reader.find_all(self.board))
-            except struct.error:
-                print(f'Skipping book "{name}" due to error.')
-                continue
-
-            if not entries:
-                continue
+        if self.book_settings.index is None:
+            return
 
+        for name, entries in self.book_settings.index.find_all(self.board, self.position_key):
             match self.book_settings.selection:
                 case "weighted_random":
                     entries.sort(key=lambda entry: random.random() ** (1.0 / entry.weight), reverse=True)
@@ -376,7 +575,8 @@ class LichessGame:
             books_config.selection,
             books_config.max_depth,
             books_config.allow_repetitions,
-            {name: chess.polyglot.open_reader(path) for name, path in books_config.names.items()},
+            book_registry.get_readers(books_config),
+            book_registry.get_index(books_config),
         )
 
     def _get_book_key(self) -> str | None:
@@ -429,11 +629,17 @@ class LichessGame:
         too_many_moves = (
             False
             if self.config.online_moves.opening_explorer.max_moves is None
-            else self.opening_explorer_counter >= self.config.online_moves.opening_explorer.max_moves
+            else self.move_counts[self._make_opening_explorer_move]
+            >= self.config.online_moves.opening_explorer.max_moves
         )
         has_time = self._has_time(self.config.online_moves.opening_explorer.min_time)
+        is_available = self._is_source_available(
+            "opening_explorer",
+            self.config.online_moves.opening_explorer.timeout,
+            self.config.online_moves.opening_explorer.min_time,
+        )
 
-        if out_of_book or too_deep or out_of_range or too_many_moves or not has_time:
+        if out_of_book or too_deep or out_of_range or too_many_moves or not has_time or not is_available:
             return
 
         if self.config.online_moves.opening_explorer.player:
@@ -449,19 +655,21 @@ class LichessGame:
         speeds = self.game_info.speed if self.game_info.variant == Variant.STANDARD else None
         modes = "rated" if self.game_info.rated else None
 
-        start_time = time.perf_counter()
-        response = await self.api.get_opening_explorer(
-            username,
-            self.board.fen(),
-            self.game_info.variant,
-            color,
-            modes,
-            speeds,
-            self.config.online_moves.opening_explorer.timeout,
-        )
+        try:
+            response = await self.api.get_opening_explorer(
+                username,
+                self.fen,
+                self.game_info.variant,
+                color,
+                modes,
+                speeds,
+                self.config.online_moves.opening_explorer.timeout,
+            )
+        except SourceUnavailableError:
+            return
+
         if response is None:
             self.out_of_opening_explorer_counter += 1
-            self._reduce_own_time(time.perf_counter() - start_time)
             return
 
         game_count = response["white"] + response["draws"] + response["black"]
@@ -469,24 +677,28 @@ class LichessGame:
             self.out_of_opening_explorer_counter += 1
             return
 
-        for move in response["moves"]:
-            move["wins"] = move["white"] if self.board.turn else move["black"]
-            move["losses"] = move["black"] if self.board.turn else move["white"]
+        moves = [
+            move
+            | {
+                "wins": move["white"] if self.board.turn else move["black"],
+                "losses": move["black"] if self.board.turn else move["white"],
+            }
+            for move in response["moves"]
+        ]
 
         if self.config.online_moves.opening_explorer.only_with_wins:
-            response["moves"] = list(filter(lambda move: move["wins"] > 0, response["moves"]))
+            moves = list(filter(lambda move: move["wins"] > 0, moves))
 
-            if not response["moves"]:
+            if not moves:
                 self.out_of_opening_explorer_counter += 1
                 return
 
         self.out_of_opening_explorer_counter = 0
-        top_move = self._get_opening_explorer_top_move(response["moves"])
+        top_move = self._get_opening_explorer_top_move(moves)
         move = chess.Move.from_uci(top_move["uci"])
         if not self.config.online_moves.opening_explorer.allow_repetitions and self._is_repetition(move):
             return
 
-        self.opening_explorer_counter += 1
         public_message = f"Explore: {self._format_move(move):14}"
         private_message = (
             f"Performance: {top_move['performance']}      "
@@ -511,32 +723,55 @@ class LichessGame:
 
         return max(moves, key=itemgetter("performance"))
 
-    async def _make_cloud_move(self) -> MoveResponse | None:
+    def _is_cloud_allowed(self, board: chess.Board) -> bool:
         out_of_book = self.out_of_cloud_counter >= 5
         too_deep = (
             False
             if self.config.online_moves.lichess_cloud.max_depth is None
-            else self.board.ply() >= self.config.online_moves.lichess_cloud.max_depth
+            else board.ply() >= self.config.online_moves.lichess_cloud.max_depth
         )
         too_many_moves = (
             False
             if self.config.online_moves.lichess_cloud.max_moves is None
-            else self.cloud_counter >= self.config.online_moves.lichess_cloud.max_moves
+            else self.move_counts[self._make_cloud_move] >= self.config.online_moves.lichess_cloud.max_moves
         )
         has_time = self._has_time(self.config.online_moves.lichess_cloud.min_time)
 
-        if out_of_book or too_deep or too_many_moves or not has_time:
+        return not (out_of_book or too_deep or too_many_moves or not has_time)
+
+    async def _make_cloud_move(self) -> MoveResponse | None:
+        if not self._is_cloud_allowed(self.board):
             return
 
-        start_time = time.perf_counter()
-        response = await self.api.get_cloud_eval(
-            self.board.fen().replace("[", "/").replace("]", ""),
-            self.game_info.variant,
+        if move_response := self._get_pv_replay_move(
+            self._make_cloud_move,
+            "Cloud:  ",
+            self.config.online_moves.lichess_cloud.min_eval_depth,
+            self.config.online_moves.lichess_cloud.allow_repetitions,
+            self.config.online_moves.lichess_cloud.trust_eval,
+        ):
+            return move_response
+
+        if not self._is_source_available(
+            "lichess_cloud",
             self.config.online_moves.lichess_cloud.timeout,
-        )
+            self.config.online_moves.lichess_cloud.min_time,
+        ):
+            return
+
+        fen = self.fen.replace("[", "/").replace("]", "")
+        try:
+            if prefetch_task := self.prefetch_tasks.pop(("cloud", fen), None):
+                response = await prefetch_task
+            else:
+                response = await self.api.get_cloud_eval(
+                    fen, self.game_info.variant, self.config.online_moves.lichess_cloud.timeout
+                )
+        except SourceUnavailableError:
+            return
+
         if response is None:
             self.out_of_cloud_counter += 1
-            self._reduce_own_time(time.perf_counter() - start_time)
             return
 
         if "error" in response:
@@ -552,45 +787,65 @@ class LichessGame:
         if not self.config.online_moves.lichess_cloud.allow_repetitions and self._is_repetition(pv[0]):
             return
 
-        self.cloud_counter += 1
         if "mate" in response["pvs"][0]:
             score = chess.engine.PovScore(chess.engine.Mate(response["pvs"][0]["mate"]), chess.WHITE)
         else:
             score = chess.engine.PovScore(chess.engine.Cp(response["pvs"][0]["cp"]), chess.WHITE)
 
-        if self.config.online_moves.lichess_cloud.trust_eval:
-            self.scores.append(score)
-
+        self._set_pv_replay(self._make_cloud_move, pv, response["depth"], score)
         message = f"Cloud:   {self._format_move(pv[0]):14} {self._format_score(score)}     Depth: {response['depth']}"
-        return MoveResponse(pv[0], message, pv=pv, trusted_eval=self.config.online_moves.lichess_cloud.trust_eval)
+        return MoveResponse(
+            pv[0], message, pv=pv, score=score, trusted_eval=self.config.online_moves.lichess_cloud.trust_eval
+        )
 
-    async def _make_chessdb_move(self) -> MoveResponse | None:
+    def _is_chessdb_allowed(self, board: chess.Board) -> bool:
         out_of_book = self.out_of_chessdb_counter >= 5
         too_deep = (
             False
             if self.config.online_moves.chessdb.max_depth is None
-            else self.board.ply() >= self.config.online_moves.chessdb.max_depth
+            else board.ply() >= self.config.online_moves.chessdb.max_depth
         )
         too_many_moves = (
             False
             if self.config.online_moves.chessdb.max_moves is None
-            else self.chessdb_counter >= self.config.online_moves.chessdb.max_moves
+            else self.move_counts[self._make_chessdb_move] >= self.config.online_moves.chessdb.max_moves
         )
         has_time = self._has_time(self.config.online_moves.chessdb.min_time)
-        is_endgame = chess.popcount(self.board.occupied) <= 7
+        is_endgame = chess.popcount(board.occupied) <= 7
+
+        return not (out_of_book or too_deep or too_many_moves or not has_time or is_endgame)
 
-        if out_of_book or too_deep or too_many_moves or not has_time or is_endgame:
+    async def _make_chessdb_move(self) -> MoveResponse | None:
+        if not self._is_chessdb_allowed(self.board):
+            return
+
+        if move_response := self._get_pv_replay_move(
+            self._make_chessdb_move,
+            "ChessDB:",
+            0,
+            self.config.online_moves.chessdb.allow_repetitions,
+            self.config.online_moves.chessdb.trust_eval,
+        ):
+            return move_response
+
+        if not self._is_source_available(
+            "chessdb", self.config.online_moves.chessdb.timeout, self.config.online_moves.chessdb.min_time
+        ):
+            return
+
+        fen = self.board.fen(shredder=True) if self.board.chess960 else self.fen
+        try:
+            if prefetch_task := self.prefetch_tasks.pop(("chessdb", fen), None):
+                response = await prefetch_task
+            else:
+                response = await self.api.get_chessdb_eval(
+                    fen, self.config.online_moves.chessdb.best_move, self.config.online_moves.chessdb.timeout
+                )
+        except SourceUnavailableError:
             return
 
-        start_time = time.perf_counter()
-        response = await self.api.get_chessdb_eval(
-            self.board.fen(shredder=self.board.chess960),
-            self.config.online_moves.chessdb.best_move,
-            self.config.online_moves.chessdb.timeout,
-        )
         if response is None:
             self.out_of_chessdb_counter += 1
-            self._reduce_own_time(time.perf_counter() - start_time)
             return
 
         if response["status"] != "ok":
@@ -604,30 +859,92 @@ class LichessGame:
         if not self.config.online_moves.chessdb.allow_repetitions and self._is_repetition(pv[0]):
             return
 
-        self.chessdb_counter += 1
         score = chess.engine.PovScore(chess.engine.Cp(response["score"]), self.board.turn)
-        if self.config.online_moves.chessdb.trust_eval:
-            self.scores.append(score)
-
+        self._set_pv_replay(self._make_chessdb_move, pv, response["depth"], score)
         message = f"ChessDB: {self._format_move(pv[0]):14} {self._format_score(score)}     Depth: {response['depth']}"
         move = self._to_chess960(pv[0]) if self.board.chess960 else pv[0]
-        return MoveResponse(move, message, pv=pv, trusted_eval=self.config.online_moves.chessdb.trust_eval)
+        return MoveResponse(move, message, pv=pv, score=score, trusted_eval=self.config.online_moves.chessdb.trust_eval)
+
+    def _set_pv_replay(
+        self,
+        method: Callable[[], Awaitable[MoveResponse | None]],
+        pv: list[chess.Move],
+        depth: int,
+        score: chess.engine.PovScore,
+    ) -> None:
+        board = self.board.copy(stack=False)
+        replay_pv: list[chess.Move] = []
+        for move in pv:
+            try:
+                move = board.parse_uci(move.uci())
+            except ValueError:
+                break
+
+            board.push(move)
+            replay_pv.append(move)
+
+        self.pv_replay = PVReplay(method, len(self.board.move_stack), replay_pv, depth, score)
+
+    def _get_pv_replay_move(
+        self,
+        method: Callable[[], Awaitable[MoveResponse | None]],
+        source_name: str,
+        min_depth: int,
+        allow_repetitions: bool,
+        trusted_eval: bool,
+    ) -> MoveResponse | None:
+        if self.pv_replay is None:
+            return
+
+        index = self._get_pv_replay_index(method, self.board.move_stack, min_depth)
+        if index is None:
+            return
+
+        depth = self.pv_replay.depth - index
+        move = self.pv_replay.pv[index]
+        if not allow_repetitions and self._is_repetition(move):
+            return
+
+        score = self.pv_replay.score
+        message = f"{source_name} {self._format_move(move):14} {self._format_score(score)}     Depth: {depth}"
+        return MoveResponse(move, message, pv=self.pv_replay.pv[index:], score=score, trusted_eval=trusted_eval)
+
+    def _get_pv_replay_index(
+        self, method: Callable[[], Awaitable[MoveResponse | None]], move_stack: list[chess.Move], min_depth: int
+    ) -> int | None:
+        if self.pv_replay is None or self.pv_replay.method != method:
+            return
+
+        index = len(move_stack) - self.pv_replay.ply
+        if index < 2 or index >= len(self.pv_replay.pv):
+            return
 
-    def _probe_gaviota(self, moves: Iterable[chess.Move]) -> GaviotaResult:
+        if move_stack[self.pv_replay.ply :] != self.pv_replay.pv[:index]:
+            return
+
+        if self.pv_replay.depth - index < min_depth:
+            return
+
+        return index
+
+    def _probe_gaviota(self, board: chess.Board, moves: list[chess.Move]) -> GaviotaResult:
+        with tablebase_registry.gaviota_lock:
+            return self._probe_gaviota_locked(board, moves)
+
+    def _probe_gaviota_locked(self, board: chess.Board, moves: list[chess.Move]) -> GaviotaResult:
         assert self.gaviota_tablebase
 
         best_move = chess.Move.null()
         best_wdl = -2
         best_dtm = 1_000_000
-        board_copy = self.board.copy(stack=False)
         for move in moves:
-            board_copy.push(move)
+            board.push(move)
 
-            if board_copy.is_checkmate():
+            if board.is_checkmate():
                 return GaviotaResult(move, 2, 0)
 
-            dtm = -self.gaviota_tablebase.probe_dtm(board_copy)
-            wdl = self._value_to_wdl(dtm, board_copy.halfmove_clock)
+            dtm = -self.gaviota_tablebase.probe_dtm(board)
+            wdl = self._value_to_wdl(dtm, board.halfmove_clock)
 
             if best_move:
                 if wdl > best_wdl:
@@ -642,10 +959,26 @@ class LichessGame:
                 best_wdl = wdl
                 best_dtm = dtm
 
-            board_copy.pop()
+            board.pop()
 
         return GaviotaResult(best_move, best_wdl, best_dtm)
 
+    async def _run_probe(
+        self, probe: Callable[[chess.Board, list[chess.Move]], ProbeResultT], moves: Iterable[chess.Move]
+    ) -> ProbeResultT | None:
+        board = self.board.copy(stack=False)
+        moves = list(moves)
+
+        try:
+            async with asyncio.timeout(TABLEBASE_PROBE_TIMEOUT):
+                return await asyncio.get_running_loop().run_in_executor(
+                    tablebase_registry.executor, probe, board, moves
+                )
+        except KeyError:
+            return
+        except TimeoutError:
+            print(f"Tablebase: Probe timed out after {TABLEBASE_PROBE_TIMEOUT} second(s).")
+
     async def _make_gaviota_move(self) -> MoveResponse | None:
         match chess.popcount(self.board.occupied):
             case pieces if pieces > self.config.gaviota.max_pieces + 1:
@@ -654,17 +987,17 @@ class LichessGame:
                 if self._has_mate_score():
                     return
 
-                try:
-                    result = self._probe_gaviota(self.board.generate_legal_captures())
-                except KeyError:
+                result = await self._run_probe(self._probe_gaviota, self.board.generate_legal_captures())
+                if result is None:
                     return
 
                 if result.wdl < 2:
                     return
+            case _ if not self._has_gaviota_table():
+                return
             case _:
-                try:
-                    result = self._probe_gaviota(self.board.generate_legal_moves())
-                except KeyError:
+                result = await self._run_probe(self._probe_gaviota, self.board.generate_legal_moves())
+                if result is None:
                     return
 
         match result.wdl:
@@ -687,22 +1020,33 @@ class LichessGame:
         message = f"Gaviota: {self._format_move(result.move):14} {egtb_info}"
         return MoveResponse(result.move, message, is_draw=offer_draw, is_lost=resign)
 
-    def _probe_syzygy(self, moves: Iterable[chess.Move]) -> SyzygyResult:
+    def _probe_syzygy(self, board: chess.Board, moves: list[chess.Move]) -> SyzygyResult:
         assert self.syzygy_tablebase
 
+        table_wdls: dict[chess.Move, int] = {}
+        for move in moves:
+            board.push(move)
+            table_wdls[move] = -tablebase_registry.probe_syzygy_wdl(self.syzygy_tablebase, board)
+            board.pop()
+
+        # Wins can turn into cursed wins and losses into blessed losses through the halfmove clock.
+        min_wdl = max((min(wdl, 1) for wdl in table_wdls.values()), default=-2)
+
         best_move = chess.Move.null()
         best_wdl = -2
         best_dtz = 1_000_000
         best_real_dtz = 0
-        board_copy = self.board.copy(stack=False)
-        for move in moves:
-            board_copy.push(move)
+        for move, table_wdl in table_wdls.items():
+            if max(table_wdl, -1) < min_wdl:
+                continue
+
+            board.push(move)
 
-            dtz = -self.syzygy_tablebase.probe_dtz(board_copy)
-            wdl = self._value_to_wdl(dtz, board_copy.halfmove_clock)
+            dtz = -tablebase_registry.probe_syzygy_dtz(self.syzygy_tablebase, board)
+            wdl = self._value_to_wdl(dtz, board.halfmove_clock)
 
             real_dtz = dtz
-            if board_copy.halfmove_clock == 0:
+            if board.halfmove_clock == 0:
                 if wdl < 0:
                     dtz += 10_000
                 elif wdl > 0:
@@ -724,26 +1068,28 @@ class LichessGame:
                 best_dtz = dtz
                 best_real_dtz = real_dtz
 
-            board_copy.pop()
+            board.pop()
 
         return SyzygyResult(best_move, best_wdl, best_real_dtz)
 
     async def _make_syzygy_move(self) -> MoveResponse | None:
+        self._warm_up_syzygy()
+
         match chess.popcount(self.board.occupied):
             case pieces if pieces > self.syzygy_config.max_pieces + 1 or self._has_mate_score():
                 return
             case pieces if pieces == self.syzygy_config.max_pieces + 1:
-                try:
-                    result = self._probe_syzygy(self.board.generate_legal_captures())
-                except KeyError:
+                result = await self._run_probe(self._probe_syzygy, self.board.generate_legal_captures())
+                if result is None:
                     return
 
                 if result.wdl < 2:
                     return
+            case _ if not self._has_syzygy_table():
+                return
             case _:
-                try:
-                    result = self._probe_syzygy(self.board.generate_legal_moves())
-                except KeyError:
+                result = await self._run_probe(self._probe_syzygy, self.board.generate_legal_moves())
+                if result is None:
                     return
 
         match result.wdl:
@@ -788,27 +1134,44 @@ class LichessGame:
 
         return 0
 
-    def _get_syzygy_tablebase(self) -> chess.syzygy.Tablebase | None:
-        if not (self.syzygy_config.enabled and self.syzygy_config.instant_play):
+    def _warm_up_syzygy(self) -> None:
+        if not self.syzygy_config.warm_up_mb:
+            return
+
+        if chess.popcount(self.board.occupied) > self.syzygy_config.max_pieces + 2:
             return
 
-        tablebase = chess.syzygy.open_tablebase(self.syzygy_config.paths[0], VariantBoard=type(self.board))
+        signature = chess.syzygy.normalize_tablename(chess.syzygy.calc_key(self.board))
+        if signature in self.warmed_syzygy_signatures:
+            return
 
-        for path in self.syzygy_config.paths[1:]:
-            tablebase.add_directory(path)
+        self.warmed_syzygy_signatures.add(signature)
+        tablebase_registry.executor.submit(
+            tablebase_registry.warm_syzygy, self.syzygy_config, type(self.board), signature
+        )
 
-        return tablebase
+    def _has_syzygy_table(self) -> bool:
+        signature = chess.syzygy.normalize_tablename(chess.syzygy.calc_key(self.board))
+        return all(self.syzygy_signatures.get(signature, (False, False)))
 
-    def _get_gaviota_tablebase(self) -> chess.gaviota.PythonTablebase | chess.gaviota.NativeTablebase | None:
-        if not self.config.gaviota.enabled:
+    def _has_gaviota_table(self) -> bool:
+        white_pieces, black_pieces = chess.syzygy.calc_key(self.board).lower().split("v")
+        return (
+            white_pieces + black_pieces in self.gaviota_signatures
+            or black_pieces + white_pieces in self.gaviota_signatures
+        )
+
+    def _get_syzygy_tablebase(self) -> chess.syzygy.Tablebase | None:
+        if not (self.syzygy_config.enabled and self.syzygy_config.instant_play):
             return
 
-        tablebase = chess.gaviota.open_tablebase(self.config.gaviota.paths[0])
+        return tablebase_registry.get_syzygy_tablebase(self.syzygy_config, type(self.board))
 
-        for path in self.config.gaviota.paths[1:]:
-            tablebase.add_directory(path)
+    def _get_gaviota_tablebase(self) -> chess.gaviota.PythonTablebase | chess.gaviota.NativeTablebase | None:
+        if not self.config.gaviota.enabled:
+            return
 
-        return tablebase
+        return tablebase_registry.get_gaviota_tablebase(self.config.gaviota)
 
     async def _make_egtb_move(self) -> MoveResponse | None:
         max_pieces = 8 if self.board.uci_variant == "chess" else 7
@@ -819,16 +1182,26 @@ class LichessGame:
                 if not any(self.board.generate_legal_captures()):
                     return
 
-        if not self._has_time(self.config.online_moves.online_egtb.min_time) or self._has_mate_score():
+        if self._has_mate_score():
+            return
+
+        if move_response := self._get_egtb_mainline_move():
+            return move_response
+
+        if not self._has_time(self.config.online_moves.online_egtb.min_time) or not self._is_source_available(
+            "online_egtb", self.config.online_moves.online_egtb.timeout, self.config.online_moves.online_egtb.min_time
+        ):
             return
 
         variant = "standard" if self.board.uci_variant == "chess" else self.board.uci_variant
         assert variant
 
-        start_time = time.perf_counter()
-        response = await self.api.get_egtb(self.board.fen(), variant, self.config.online_moves.online_egtb.timeout)
+        try:
+            response = await self.api.get_egtb(self.fen, variant, self.config.online_moves.online_egtb.timeout)
+        except SourceUnavailableError:
+            return
+
         if response is None:
-            self._reduce_own_time(time.perf_counter() - start_time)
             return
 
         outcome: str = response["category"]
@@ -842,9 +1215,54 @@ class LichessGame:
         offer_draw = outcome in {"draw", "blessed loss"}
         resign = outcome == "loss"
         move = chess.Move.from_uci(uci_move)
+        if outcome == "win" and variant == "standard":
+            self._start_egtb_mainline(move)
+
         message = f"EGTB:    {self._format_move(move):14} {self._format_egtb_info(outcome, dtz, dtm, dtc)}"
         return MoveResponse(move, message, is_draw=offer_draw, is_lost=resign)
 
+    def _start_egtb_mainline(self, move: chess.Move) -> None:
+        if self.egtb_mainline_task:
+            self.egtb_mainline_task.cancel()
+            self.egtb_mainline_task = None
+
+        self.egtb_mainline.clear()
+        board = self.board.copy(stack=False)
+        board.push(move)
+        if board.is_game_over():
+            return
+
+        self.egtb_mainline_ply = len(self.uci_moves) + 1
+        self.egtb_mainline_task = asyncio.create_task(
+            self.api.get_egtb_mainline(board.fen(), "standard", self.config.online_moves.online_egtb.timeout)
+        )
+
+    def _get_egtb_mainline_move(self) -> MoveResponse | None:
+        if self.egtb_mainline_task and self.egtb_mainline_task.done():
+            if (
+                not self.egtb_mainline_task.cancelled()
+                and self.egtb_mainline_task.exception() is None
+                and (response := self.egtb_mainline_task.result())
+                and response.get("winner") == ("w" if self.is_white else "b")
+            ):
+                self.egtb_mainline = [mainline_move["uci"] for mainline_move in response["mainline"]]
+            self.egtb_mainline_task = None
+
+        index = len(self.uci_moves) - self.egtb_mainline_ply
+        if index < 1 or index >= len(self.egtb_mainline):
+            return
+
+        if self.uci_moves[self.egtb_mainline_ply :] != self.egtb_mainline[:index]:
+            self.egtb_mainline.clear()
+            return
+
+        move = chess.Move.from_uci(self.egtb_mainline[index])
+        if not self.board.is_legal(move):
+            return
+
+        message = f"EGTB:    {self._format_move(move):14} {self._format_egtb_info('win')}     Mainline"
+        return MoveResponse(move, message)
+
     def _format_move(self, move: chess.Move) -> str:
         if self.board.turn:
             move_number = f"{self.board.fullmove_number}."
@@ -879,9 +1297,10 @@ class LichessGame:
 
         info_tbhits = info.get("tbhits")
         tbhits = f"TB: {self._format_number(info_tbhits)}" if info_tbhits else ""
+        cpus = f"CPUs: {self.engine.cpu_list}" if self.engine.cpus else ""
         delimiter = 5 * " "
 
-        return delimiter.join((score, depth, nodes, nps, time_str, hashfull, tbhits))
+        return delimiter.join((score, depth, nodes, nps, time_str, hashfull, tbhits, cpus)).rstrip()
 
     @staticmethod
     def _format_number(number: int) -> str:
@@ -930,29 +1349,32 @@ class LichessGame:
 
         return output
 
-    def _get_move_sources(self) -> list[Callable[[], Awaitable[MoveResponse | None]]]:
-        sources: list[Callable[[], Awaitable[MoveResponse | None]]] = []
+    def _get_move_sources(self) -> list[MoveSource]:
+        sources: list[MoveSource] = []
 
         sources.extend(self._get_endgame_sources())
 
         opening_sources = self._get_opening_sources()
         opening_sources.sort(key=lambda source: source.priority, reverse=True)
 
-        sources.extend([source.method for source in opening_sources if source.is_available])
+        sources.extend([source for source in opening_sources if source.is_available])
 
         return sources
 
-    def _get_endgame_sources(self) -> list[Callable[[], Awaitable[MoveResponse | None]]]:
-        sources: list[Callable[[], Awaitable[MoveResponse | None]]] = []
+    def _get_endgame_sources(self) -> list[MoveSource]:
+        sources: list[MoveSource] = []
 
         if self.config.gaviota.enabled and self.board.uci_variant == "chess":
-            sources.append(self._make_gaviota_move)
+            sources.append(MoveSource(method=self._make_gaviota_move, priority=0))
 
         if self.syzygy_config.enabled and self.syzygy_config.instant_play:
-            sources.append(self._make_syzygy_move)
+            sources.append(MoveSource(method=self._make_syzygy_move, priority=0))
 
-        if self.config.online_moves.online_egtb.enabled and self.board.uci_variant in {"chess", "antichess", "atomic"}:
-            sources.append(self._make_egtb_move)
+        egtb_config = self.config.online_moves.online_egtb
+        if egtb_config.enabled and self.board.uci_variant in {"chess", "antichess", "atomic"}:
+            sources.append(
+                MoveSource(method=self._make_egtb_move, priority=0, is_online=True, timeout=egtb_config.timeout)
+            )
 
         return sources
 
@@ -973,6 +1395,8 @@ class LichessGame:
                         self._check_variant_condition(explorer_config.use_for_variants),
                         self._check_variant_condition(explorer_config.player != "masters"),
                     ],
+                    is_online=True,
+                    timeout=explorer_config.timeout,
                 )
             )
 
@@ -986,6 +1410,8 @@ class LichessGame:
                         self._check_book_condition(cloud_config.only_without_book),
                         self._check_variant_condition(cloud_config.use_for_variants),
                     ],
+                    is_online=True,
+                    timeout=cloud_config.timeout,
                 )
             )
 
@@ -999,6 +1425,8 @@ class LichessGame:
                         self._check_book_condition(chessdb_config.only_without_book),
                         self.board.uci_variant == "chess",
                     ],
+                    is_online=True,
+                    timeout=chessdb_config.timeout,
                 )
             )
 
@@ -1013,6 +1441,13 @@ class LichessGame:
     def _get_move_overhead(self, engine_config: EngineConfig) -> float:
         return max(self.game_info.initial_time_ms / 60_000 * engine_config.move_overhead_multiplier, 1.0)
 
+    def _is_source_available(self, source: str, timeout: int, min_time: float) -> bool:
+        budget = float(timeout)
+        if len(self.board.move_stack) >= 2:
+            budget = min(budget, self.own_time - min_time)
+
+        return source_health.is_available(source, budget)
+
     def _has_time(self, min_time: float) -> bool:
         if len(self.board.move_stack) < 2:
             return True
@@ -1031,10 +1466,38 @@ class LichessGame:
         else:
             self.black_time -= seconds
 
+    def _init_position_keys(self) -> None:
+        board = self.board.root()
+        self._add_position_key(board)
+        for move in self.board.move_stack:
+            board.push(move)
+            self._add_position_key(board)
+
+    def _add_position_key(self, board: chess.Board) -> None:
+        self.position_keys.append(chess.polyglot.zobrist_hash(board))
+        transposition_key = board._transposition_key()
+        self.transposition_keys.append(transposition_key)
+        self.position_counts[transposition_key] += 1
+
+    def _push(self, move: chess.Move, uci_move: str | None = None) -> None:
+        self.board.push(move)
+        self._add_position_key(self.board)
+        self.uci_moves.append(uci_move or move.uci())
+        self._fen = None
+
+    def _pop(self) -> chess.Move:
+        move = self.board.pop()
+        self.position_keys.pop()
+        self.position_counts[self.transposition_keys.pop()] -= 1
+        self.uci_moves.pop()
+        self._fen = None
+        return move
+
     def _is_repetition(self, move: chess.Move) -> bool:
-        board = self.board.copy()
-        board.push(move)
-        return board.is_repetition(count=2)
+        self.board.push(move)
+        transposition_key = self.board._transposition_key()
+        self.board.pop()
+        return self.position_counts[transposition_key] > 0
 
     def _has_mate_score(self) -> bool:
         if not self.scores:
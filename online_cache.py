@@ -0,0 +1,88 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Any
+
+from configs import OnlineCacheConfig
+
+
+class OnlineCache:
+    def __init__(self, config: OnlineCacheConfig) -> None:
+        self.config = config
+        if directory := os.path.dirname(config.path):
+            os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(config.path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, source TEXT NOT NULL, response TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)")
+        self.connection.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+        self.size = self._get_size()
+
+    @staticmethod
+    def get_key(source: str, fen: str, *params: Any) -> str:
+        if source != "online_egtb":
+            fen = " ".join(fen.split()[:4])
+
+        return json.dumps([source, fen, *params])
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        row = self.connection.execute(
+            "SELECT response FROM responses WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return False, None
+
+        return True, json.loads(row[0])
+
+    def set(self, source: str, key: str, response: Any, is_negative: bool = False) -> None:
+        ttl = self.config.negative_ttl if is_negative else self.config.ttls.get(source, 0)
+        if ttl <= 0:
+            return
+
+        text = json.dumps(response, separators=(",", ":"))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO responses (key, source, response, expires) VALUES (?, ?, ?, ?)",
+            (key, source, text, time.time() + ttl),
+        )
+        self.size += len(key) + len(text)
+
+        if self.size > self.config.max_size_mb * 1_000_000:
+            self._evict()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _evict(self) -> None:
+        now = time.time()
+        self.connection.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+        self.size = self._get_size()
+
+        target_size = self.config.max_size_mb * 900_000
+        if self.size <= target_size:
+            return
+
+        keys: list[tuple[str]] = []
+        excess = self.size - target_size
+        for key, size in self.connection.execute(
+            "SELECT key, LENGTH(key) + LENGTH(response) FROM responses ORDER BY expires"
+        ):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", keys)
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.size = self._get_size()
+
+    def _get_size(self) -> int:
+        row = self.connection.execute(
+            "SELECT COALESCE(SUM(LENGTH(key) + LENGTH(response)), 0) FROM responses"
+        ).fetchone()
+        return row[0]
@@ -0,0 +1,59 @@
+from itertools import count
+from typing import Any
+
+import psutil
+
+from configs import EngineConfig
+
+DEFAULT_THREADS = 1
+DEFAULT_HASH = 16
+MEMORY_FRACTION = 0.5
+
+
+class ResourceGovernor:
+    def __init__(self) -> None:
+        self.cpus = sorted(psutil.Process().cpu_affinity()) if hasattr(psutil.Process, "cpu_affinity") else []
+        self.cores = len(self.cpus) or psutil.cpu_count(logical=True) or 1
+        self.hash_mb = max(int(psutil.virtual_memory().total * MEMORY_FRACTION) >> 20, DEFAULT_HASH)
+        self.reservations: dict[int, tuple[int, int, list[int]]] = {}
+        self.reservation_ids = count()
+        self.concurrency = 1
+
+    def set_concurrency(self, concurrency: int) -> None:
+        self.concurrency = max(concurrency, 1)
+
+    def reserve(self, engine_config: EngineConfig) -> tuple[int, dict[str, Any], list[int]]:
+        threads = DEFAULT_THREADS
+        hash_mb = DEFAULT_HASH
+        resources: dict[str, Any] = {}
+
+        for name, value in engine_config.uci_options.items():
+            if not isinstance(value, int):
+                continue
+
+            if name.lower() == "threads":
+                threads = self._get_share(value, self.cores, 0, 1)
+                resources[name] = threads
+            elif name.lower() == "hash":
+                hash_mb = self._get_share(value, self.hash_mb, 1, DEFAULT_HASH)
+                resources[name] = hash_mb
+
+        cpus = self._get_free_cpus(threads) if engine_config.cpu_affinity else []
+        reservation_id = next(self.reservation_ids)
+        self.reservations[reservation_id] = (threads, hash_mb, cpus)
+        return reservation_id, resources, cpus
+
+    def release(self, reservation_id: int) -> None:
+        self.reservations.pop(reservation_id, None)
+
+    def _get_share(self, requested: int, total: int, index: int, minimum: int) -> int:
+        used = sum(reservation[index] for reservation in self.reservations.values())
+        share = min(requested, total // max(len(self.reservations) + 1, self.concurrency), total - used)
+        return max(share, minimum)
+
+    def _get_free_cpus(self, threads: int) -> list[int]:
+        used_cpus = {cpu for _, _, cpus in self.reservations.values() for cpu in cpus}
+        return [cpu for cpu in self.cpus if cpu not in used_cpus][:threads]
+
+
+resource_governor = ResourceGovernor()
@@ -0,0 +1,109 @@
+import time
+from collections import defaultdict, deque
+
+LATENCY_SAMPLES = 100
+RESULT_SAMPLES = 20
+MIN_RESULTS = 10
+MAX_FAILURE_RATE = 0.5
+MAX_CONSECUTIVE_FAILURES = 5
+MIN_COOLDOWN = 30.0
+LATENCY_MAX_AGE = 600.0
+MAX_COOLDOWN = 600.0
+PROBE_TIMEOUT = 30.0
+
+
+class SourceHealth:
+    def __init__(self) -> None:
+        self.latencies: deque[tuple[float, float]] = deque(maxlen=LATENCY_SAMPLES)
+        self.results: deque[bool] = deque(maxlen=RESULT_SAMPLES)
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.cooldown = MIN_COOLDOWN
+        self.probe_started_at: float | None = None
+        self.last_request_at = 0.0
+
+    @property
+    def p95(self) -> float | None:
+        while self.latencies and time.monotonic() - self.latencies[0][0] > LATENCY_MAX_AGE:
+            self.latencies.popleft()
+
+        if len(self.latencies) < MIN_RESULTS:
+            return
+
+        latencies = sorted(latency for _, latency in self.latencies)
+        return latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+
+    @property
+    def failure_rate(self) -> float:
+        if not self.results:
+            return 0.0
+
+        return self.results.count(False) / len(self.results)
+
+
+class SourceHealthTracker:
+    def __init__(self) -> None:
+        self.sources: defaultdict[str, SourceHealth] = defaultdict(SourceHealth)
+
+    def is_available(self, source: str, budget: float) -> bool:
+        health = self.sources[source]
+        if health.opened_at is not None:
+            return time.monotonic() - health.opened_at >= health.cooldown
+
+        p95 = health.p95
+        if p95 is None or p95 <= budget:
+            return True
+
+        return time.monotonic() - health.last_request_at >= health.cooldown
+
+    def allow_request(self, source: str) -> bool:
+        health = self.sources[source]
+        now = time.monotonic()
+        if health.opened_at is None:
+            health.last_request_at = now
+            return True
+
+        if now - health.opened_at < health.cooldown:
+            return False
+
+        if health.probe_started_at is not None and now - health.probe_started_at < PROBE_TIMEOUT:
+            return False
+
+        health.probe_started_at = now
+        health.last_request_at = now
+        return True
+
+    def record_success(self, source: str, latency: float) -> None:
+        health = self.sources[source]
+        health.latencies.append((time.monotonic(), latency))
+        health.results.append(True)
+        health.consecutive_failures = 0
+
+        if health.opened_at is not None:
+            print(f"{source}: Recovered, closing circuit.")
+            health.opened_at = None
+            health.probe_started_at = None
+            health.cooldown = MIN_COOLDOWN
+            health.results.clear()
+
+    def record_failure(self, source: str) -> None:
+        health = self.sources[source]
+        health.results.append(False)
+        health.consecutive_failures += 1
+
+        if health.opened_at is not None:
+            if health.probe_started_at is None:
+                return
+
+            health.cooldown = min(health.cooldown * 2, MAX_COOLDOWN)
+        elif health.consecutive_failures < MAX_CONSECUTIVE_FAILURES and (
+            len(health.results) < MIN_RESULTS or health.failure_rate < MAX_FAILURE_RATE
+        ):
+            return
+
+        health.opened_at = time.monotonic()
+        health.probe_started_at = None
+        print(f"{source}: Unavailable, opening circuit for {health.cooldown:.0f} seconds.")
+
+
+source_health = SourceHealthTracker()
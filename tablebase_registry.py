@@ -0,0 +1,203 @@
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import chess
+import chess.gaviota
+import chess.polyglot
+import chess.syzygy
+
+from configs import GaviotaConfig, SyzygyConfig
+
+SYZYGY_PROBE_CACHE_SIZE = 100_000
+
+
+class TablebaseRegistry:
+    def __init__(self) -> None:
+        self.executor = ThreadPoolExecutor(thread_name_prefix="tablebase")
+        self.syzygy_tablebases: dict[tuple[str, tuple[str, ...]], chess.syzygy.Tablebase] = {}
+        self.gaviota_tablebases: dict[
+            tuple[str, ...], chess.gaviota.PythonTablebase | chess.gaviota.NativeTablebase
+        ] = {}
+        self.syzygy_signatures: dict[tuple[str, tuple[str, ...]], dict[str, tuple[bool, bool]]] = {}
+        self.syzygy_files: dict[tuple[str, tuple[str, ...]], dict[str, list[str]]] = {}
+        self.gaviota_signatures: dict[tuple[str, ...], set[str]] = {}
+        self.gaviota_lock = threading.Lock()
+        self.syzygy_probe_cache: dict[tuple[str, int, bool], int] = {}
+        self.syzygy_probe_cache_lock = threading.Lock()
+
+    def get_syzygy_tablebase(
+        self, syzygy_config: SyzygyConfig, VariantBoard: type[chess.Board]
+    ) -> chess.syzygy.Tablebase:
+        key = self._get_syzygy_key(syzygy_config, VariantBoard)
+        if (tablebase := self.syzygy_tablebases.get(key)) is not None:
+            return tablebase
+
+        tablebase = chess.syzygy.open_tablebase(key[1][0], VariantBoard=VariantBoard)
+        signatures: dict[str, tuple[bool, bool]] = {}
+        files: dict[str, list[str]] = {}
+        self._add_syzygy_signatures(signatures, files, key[1][0], VariantBoard)
+
+        for path in key[1][1:]:
+            tablebase.add_directory(path)
+            self._add_syzygy_signatures(signatures, files, path, VariantBoard)
+
+        self.syzygy_tablebases[key] = tablebase
+        self.syzygy_signatures[key] = signatures
+        self.syzygy_files[key] = files
+        return tablebase
+
+    def get_syzygy_signatures(
+        self, syzygy_config: SyzygyConfig, VariantBoard: type[chess.Board]
+    ) -> dict[str, tuple[bool, bool]]:
+        self.get_syzygy_tablebase(syzygy_config, VariantBoard)
+        return self.syzygy_signatures[self._get_syzygy_key(syzygy_config, VariantBoard)]
+
+    def warm_syzygy(self, syzygy_config: SyzygyConfig, VariantBoard: type[chess.Board], signature: str) -> None:
+        self.get_syzygy_tablebase(syzygy_config, VariantBoard)
+        files = self.syzygy_files[self._get_syzygy_key(syzygy_config, VariantBoard)]
+        budget = syzygy_config.warm_up_mb * 1_000_000
+        warmed_bytes = 0
+
+        for reachable_signature in self._get_reachable_signatures(signature, VariantBoard.one_king):
+            for path in files.get(reachable_signature, []):
+                size = os.path.getsize(path)
+                if warmed_bytes + size > budget:
+                    continue
+
+                warmed_bytes += size
+                self._warm_file(path)
+
+    @staticmethod
+    def _get_syzygy_key(syzygy_config: SyzygyConfig, VariantBoard: type[chess.Board]) -> tuple[str, tuple[str, ...]]:
+        return VariantBoard.uci_variant, tuple(os.path.realpath(path) for path in syzygy_config.paths)
+
+    @staticmethod
+    def _get_reachable_signatures(signature: str, one_king: bool) -> list[str]:
+        signatures = [chess.syzygy.normalize_tablename(signature)]
+        index = 0
+        while index < len(signatures):
+            white_pieces, black_pieces = signatures[index].split("v")
+            index += 1
+
+            for pieces, other_pieces in ((white_pieces, black_pieces), (black_pieces, white_pieces)):
+                for piece_index, piece in enumerate(pieces):
+                    if piece == "K" and one_king:
+                        continue
+
+                    remaining_pieces = pieces[:piece_index] + pieces[piece_index + 1 :]
+                    candidates = [remaining_pieces]
+                    if piece == "P":
+                        candidates.extend(remaining_pieces + promotion for promotion in "QRBN")
+
+                    for candidate in candidates:
+                        if not candidate:
+                            continue
+
+                        reachable_signature = chess.syzygy.normalize_tablename(f"{candidate}v{other_pieces}")
+                        if reachable_signature not in signatures:
+                            signatures.append(reachable_signature)
+
+        return signatures
+
+    @staticmethod
+    def _warm_file(path: str) -> None:
+        with open(path, "rb") as file:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                return
+
+            while file.read(1 << 20):
+                pass
+
+    @staticmethod
+    def _add_syzygy_signatures(
+        signatures: dict[str, tuple[bool, bool]],
+        files: dict[str, list[str]],
+        path: str,
+        VariantBoard: type[chess.Board],
+    ) -> None:
+        for filename in os.listdir(path):
+            name, extension = os.path.splitext(filename)
+            if extension not in {VariantBoard.tbw_suffix, VariantBoard.tbz_suffix}:
+                continue
+
+            if not chess.syzygy.is_tablename(name, one_king=VariantBoard.one_king, normalized=False):
+                continue
+
+            signature = chess.syzygy.normalize_tablename(name)
+            files.setdefault(signature, []).append(os.path.join(path, filename))
+            has_wdl, has_dtz = signatures.get(signature, (False, False))
+            signatures[signature] = (
+                has_wdl or extension == VariantBoard.tbw_suffix,
+                has_dtz or extension == VariantBoard.tbz_suffix,
+            )
+
+    def get_gaviota_tablebase(
+        self, gaviota_config: GaviotaConfig
+    ) -> chess.gaviota.PythonTablebase | chess.gaviota.NativeTablebase:
+        key = tuple(os.path.realpath(path) for path in gaviota_config.paths)
+        if (tablebase := self.gaviota_tablebases.get(key)) is not None:
+            return tablebase
+
+        tablebase = chess.gaviota.open_tablebase(key[0])
+        signatures: set[str] = set()
+        self._add_gaviota_signatures(signatures, key[0])
+
+        for path in key[1:]:
+            tablebase.add_directory(path)
+            self._add_gaviota_signatures(signatures, path)
+
+        self.gaviota_tablebases[key] = tablebase
+        self.gaviota_signatures[key] = signatures
+        return tablebase
+
+    def get_gaviota_signatures(self, gaviota_config: GaviotaConfig) -> set[str]:
+        self.get_gaviota_tablebase(gaviota_config)
+        return self.gaviota_signatures[tuple(os.path.realpath(path) for path in gaviota_config.paths)]
+
+    @staticmethod
+    def _add_gaviota_signatures(signatures: set[str], path: str) -> None:
+        for filename in os.listdir(path):
+            name, _, extension = filename.partition(".")
+            if extension.startswith("gtb") and name.startswith("k") and name.count("k") == 2:
+                signatures.add(name)
+
+    def probe_syzygy_wdl(self, tablebase: chess.syzygy.Tablebase, board: chess.Board) -> int:
+        return self._probe_syzygy(tablebase.probe_wdl, board, False)
+
+    def probe_syzygy_dtz(self, tablebase: chess.syzygy.Tablebase, board: chess.Board) -> int:
+        return self._probe_syzygy(tablebase.probe_dtz, board, True)
+
+    def _probe_syzygy(self, probe: Callable[[chess.Board], int], board: chess.Board, is_dtz: bool) -> int:
+        key = (board.uci_variant, chess.polyglot.zobrist_hash(board), is_dtz)
+        with self.syzygy_probe_cache_lock:
+            if (value := self.syzygy_probe_cache.get(key)) is not None:
+                return value
+
+        value = probe(board)
+        with self.syzygy_probe_cache_lock:
+            if len(self.syzygy_probe_cache) >= SYZYGY_PROBE_CACHE_SIZE:
+                self.syzygy_probe_cache.pop(next(iter(self.syzygy_probe_cache)))
+
+            self.syzygy_probe_cache[key] = value
+
+        return value
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+        for syzygy_tablebase in self.syzygy_tablebases.values():
+            syzygy_tablebase.close()
+
+        for gaviota_tablebase in self.gaviota_tablebases.values():
+            gaviota_tablebase.close()
+
+        self.syzygy_tablebases.clear()
+        self.syzygy_files.clear()
+        self.syzygy_probe_cache.clear()
+        self.gaviota_tablebases.clear()
+
+
+tablebase_registry = TablebaseRegistry()
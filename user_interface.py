@@ -4,10 +4,12 @@ import logging
 import os
 import signal
 import sys
+from collections.abc import Iterable
 from enum import StrEnum
 from typing import TypeVar
 
 from api import API
+from book_registry import book_registry
 from botli_dataclasses import ChallengeRequest
 from config import Config
 from engine import Engine
@@ -15,7 +17,10 @@ from enums import ChallengeColor, PerfType, Variant
 from event_handler import EventHandler
 from game_manager import GameManager
 from logo import LOGO
+from resource_governor import resource_governor
+from tablebase_registry import tablebase_registry
 
+from chess.variant import find_variant
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -67,6 +72,9 @@ class UserInterface:
             self.api.append_user_agent(username)
             await self._handle_bot_status(account.get("title"), allow_upgrade)
             await self._test_engines()
+            book_registry.open_books(self.config.opening_books)
+            self._open_tablebases()
+            resource_governor.set_concurrency(self.config.challenge.concurrency)
             await self._download_online_blacklists()
 
             self.game_manager = GameManager(self.api, self.config, username)
@@ -158,6 +166,30 @@ class UserInterface:
 
         console.print()
 
+    def _open_tablebases(self) -> None:
+        for variant, syzygy_config in self.config.syzygy.items():
+            if not (syzygy_config.enabled and syzygy_config.instant_play):
+                continue
+
+            signatures = tablebase_registry.get_syzygy_signatures(syzygy_config, find_variant(variant))
+            wdl_count = sum(has_wdl for has_wdl, _ in signatures.values())
+            dtz_count = sum(has_dtz for _, has_dtz in signatures.values())
+            console.print(
+                f"Syzygy {variant}: [bold]{wdl_count}[/bold] WDL and [bold]{dtz_count}[/bold] DTZ tables "
+                f"up to [bold]{self._get_max_table_pieces(signatures)}[/bold] pieces."
+            )
+
+        if self.config.gaviota.enabled:
+            signatures = tablebase_registry.get_gaviota_signatures(self.config.gaviota)
+            console.print(
+                f"Gaviota: [bold]{len(signatures)}[/bold] tables "
+                f"up to [bold]{self._get_max_table_pieces(signatures)}[/bold] pieces."
+            )
+
+    @staticmethod
+    def _get_max_table_pieces(signatures: Iterable[str]) -> int:
+        return max((len(signature.replace("v", "")) for signature in signatures), default=0)
+
     async def _download_online_blacklists(self) -> None:
         for url in self.config.online_blacklists:
             online_blacklist = await self.api.download_blacklist(url) or []